@@ -0,0 +1,136 @@
+"""
+Measure the throughput and the latency of the sync and async clients
+against the local mock server, over real HTTP.
+
+Run with:
+
+    python -m benchmarks.loadtest [--requests N] [--concurrency C]
+                                  [--latency SECONDS] [--fault-rate RATE]
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+from mondo.client import MondoClient
+from mondo.retry import RetryPolicy
+from test.mock_server import ACCOUNT_ID, MockMondoServer
+
+OPERATIONS = ['balance', 'accounts', 'transaction', 'transactions']
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def report(name: str, latencies: List[float], errors: int, elapsed: float):
+    print('{:<24} {:>8.1f} req/s   p50 {:>7.2f}ms   p99 {:>7.2f}ms   '
+          'errors {}'.format(
+              name, len(latencies) / elapsed,
+              percentile(latencies, 0.50) * 1000,
+              percentile(latencies, 0.99) * 1000, errors))
+
+
+def operation(client: MondoClient, name: str, transaction_ids: List[str]):
+    if name == 'balance':
+        return lambda i: client.get_balance(ACCOUNT_ID)
+    if name == 'accounts':
+        return lambda i: client.list_accounts()
+    if name == 'transaction':
+        return lambda i: client.get_transaction(
+            transaction_ids[i % len(transaction_ids)])
+    return lambda i: client.list_transactions(ACCOUNT_ID, limit=100)
+
+
+def async_operation(client: MondoClient, name: str,
+                    transaction_ids: List[str]):
+    if name == 'transaction':
+        return lambda i: client.get_transaction_async(
+            transaction_ids[i % len(transaction_ids)])
+    if name == 'transactions':
+        return lambda i: client.list_transactions_async(ACCOUNT_ID, limit=100)
+    return None
+
+
+def run_sync(call: Callable, requests: int, concurrency: int):
+    latencies = []
+    errors = 0
+
+    def timed(i):
+        start = time.perf_counter()
+        call(i)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(timed, i) for i in range(requests)]
+        for future in futures:
+            try:
+                latencies.append(future.result())
+            except Exception:
+                errors += 1
+    return latencies, errors, time.perf_counter() - start
+
+
+async def run_async(call: Callable, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await call(i)
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *[timed(i) for i in range(requests)], return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    latencies = [r for r in results if not isinstance(r, BaseException)]
+    return latencies, len(results) - len(latencies), elapsed
+
+
+def run(requests: int = 1000, concurrency: int = 16, transactions: int = 10000,
+        latency: float = 0.0, fault_rate: float = 0.0):
+    retry_policy = RetryPolicy(max_retries=5, backoff_factor=0.01)
+    with MockMondoServer(transactions=transactions, latency=latency,
+                         fault_rate=fault_rate) as server:
+        transaction_ids = [t['id'] for t in server.transactions]
+        client = MondoClient('randomToken', pool_size=concurrency,
+                             retry_policy=retry_policy)
+        client.BASE_API_URL = server.url
+
+        print('{} requests, concurrency {}, latency {}s, fault rate {}'.format(
+            requests, concurrency, latency, fault_rate))
+        with client:
+            for name in OPERATIONS:
+                report('sync ' + name, *run_sync(
+                    operation(client, name, transaction_ids),
+                    requests, concurrency))
+
+            async def run_all_async():
+                async with client:
+                    for name in OPERATIONS:
+                        call = async_operation(client, name, transaction_ids)
+                        if call is not None:
+                            report('async ' + name, *await run_async(
+                                call, requests, concurrency))
+
+            asyncio.run(run_all_async())
+        print('server handled {} requests, {} faults'.format(
+            server.requests, server.faults))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--transactions', type=int, default=10000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--fault-rate', type=float, default=0.0)
+    args = parser.parse_args()
+    run(args.requests, args.concurrency, args.transactions, args.latency,
+        args.fault_rate)
@@ -0,0 +1,199 @@
+"""
+Time and peak memory of the model layer hot paths (Transaction construction,
+Amount arithmetic, timestamp parsing and build_url) on synthetic transaction
+lists, compared with the baselines stored in benchmarks/baselines.json.
+
+Run with:
+
+    python -m benchmarks.models [--sizes 1000 100000 1000000]
+                                [--tolerance 0.25] [--update]
+
+The transactions are generated (and processed) in batches of BATCH_SIZE,
+so that the 1M run fits in memory; the peak memory is the one of a batch.
+Exits with status 1 when a case is slower or bigger than its baseline
+by more than the tolerance.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from functools import reduce
+from typing import Dict, Iterable, List
+
+import dateutil.parser
+
+from mondo.client import MondoClient
+from mondo.mondo import Amount, Transaction
+from mondo.utils import build_url, parse_datetime
+from test.mock_api_response import generate_transactions
+
+BATCH_SIZE = 10000
+SIZES = [1000, 100000, 1000000]
+BASELINES = os.path.join(os.path.dirname(__file__), 'baselines.json')
+# differences below these are noise, whatever the tolerance
+MIN_DELTA = {'time': 0.005, 'peak': 16 * 1024}
+
+
+def transaction_init(client, batch):
+    return [Transaction(client=client, **payload) for payload in batch]
+
+
+def transaction_fields(client, batch):
+    transactions = transaction_init(client, batch)
+    for transaction in transactions:
+        transaction.amount
+        transaction.created
+        transaction.merchant
+    return transactions
+
+
+def amount_add(client, batch):
+    amounts = [Amount.from_minor(payload['amount'], 'GBP') for payload in batch]
+    return reduce(lambda a, b: a + b, amounts)
+
+
+def amount_total(client, batch):
+    return Amount.total(
+        (Amount.from_minor(payload['amount'], 'GBP') for payload in batch),
+        'GBP')
+
+
+def dateutil_parse(client, batch):
+    return [dateutil.parser.parse(payload['created']) for payload in batch]
+
+
+def fast_parse(client, batch):
+    return [parse_datetime(payload['created']) for payload in batch]
+
+
+def build_urls(client, batch):
+    return [
+        build_url(client.BASE_API_URL, '/transactions/' + payload['id'],
+                  {'expand[]': 'merchant'})
+        for payload in batch
+    ]
+
+
+CASES = OrderedDict([
+    ('transaction_init', transaction_init),
+    ('transaction_fields', transaction_fields),
+    ('amount_add', amount_add),
+    ('amount_total', amount_total),
+    ('dateutil_parse', dateutil_parse),
+    ('parse_datetime', fast_parse),
+    ('build_url', build_urls),
+])
+
+
+def batches(size: int) -> Iterable[List[dict]]:
+    payloads = generate_transactions(size)
+    while True:
+        batch = list(itertools.islice(payloads, BATCH_SIZE))
+        if not batch:
+            return
+        yield batch
+
+
+def measure(size: int, cases: Iterable[str] = None) -> Dict[str, dict]:
+    """
+    :param size: number of transactions
+    :param cases: the names of the cases to run (defaults to all)
+    :return: a dict of case -> {'time': seconds, 'peak': bytes}
+    """
+    cases = list(cases or CASES)
+    results = OrderedDict((case, {'time': 0.0, 'peak': 0}) for case in cases)
+
+    for index, batch in enumerate(batches(size)):
+        for case in cases:
+            function = CASES[case]
+            # a fresh client per batch, so the interner starts empty
+            client = MondoClient('benchmark')
+            start = time.perf_counter()
+            function(client, batch)
+            results[case]['time'] += time.perf_counter() - start
+
+            if index == 0:
+                # traced separately, since tracemalloc slows everything down
+                client = MondoClient('benchmark')
+                tracemalloc.start()
+                function(client, batch)
+                results[case]['peak'] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            client.close()
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict],
+            tolerance: float) -> List[str]:
+    """
+    :return: the description of every regression beyond the tolerance
+    """
+    regressions = []
+    for case, result in results.items():
+        expected = baseline.get(case)
+        if not expected:
+            continue
+        for metric in ('time', 'peak'):
+            if result[metric] > expected[metric] * (1 + tolerance) and \
+                    result[metric] - expected[metric] > MIN_DELTA[metric]:
+                regressions.append('{}: {} {:.4g} > baseline {:.4g}'.format(
+                    case, metric, result[metric], expected[metric]))
+    return regressions
+
+
+def load_baselines(path: str = BASELINES) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as baselines:
+        return json.load(baselines)
+
+
+def save_baselines(baselines: dict, path: str = BASELINES):
+    with open(path, 'w') as output:
+        json.dump(baselines, output, indent=2, sort_keys=True)
+        output.write('\n')
+
+
+def run(sizes: Iterable[int] = SIZES, tolerance: float = 0.25,
+        update: bool = False, path: str = BASELINES) -> List[str]:
+    baselines = load_baselines(path)
+    regressions = []
+
+    for size in sizes:
+        results = measure(size)
+        baseline = baselines.get(str(size), {})
+        print('{} transactions'.format(size))
+        for case, result in results.items():
+            expected = baseline.get(case)
+            print('  {:<20} {:>9.4f}s {:>10.1f}KiB{}'.format(
+                case, result['time'], result['peak'] / 1024,
+                '   (baseline {:.4f}s {:.1f}KiB)'.format(
+                    expected['time'], expected['peak'] / 1024)
+                if expected else ''))
+        regressions.extend(
+            '{} transactions, {}'.format(size, regression)
+            for regression in compare(results, baseline, tolerance))
+        if update:
+            baselines[str(size)] = results
+
+    if update:
+        save_baselines(baselines, path)
+    for regression in regressions:
+        print('REGRESSION ' + regression)
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown, i.e. 0.25 for 25%%')
+    parser.add_argument('--update', action='store_true',
+                        help='store this run as the new baselines')
+    args = parser.parse_args()
+    regressions = run(args.sizes, args.tolerance, args.update)
+    sys.exit(1 if regressions and not args.update else 0)
@@ -0,0 +1,50 @@
+"""
+Compare the fast-path timestamp parser with dateutil on a list of
+timestamps shaped like the ones returned by the API.
+
+Run with:
+
+    python -m benchmarks.timestamps [number_of_timestamps]
+"""
+import datetime
+import random
+import sys
+import timeit
+
+import dateutil.parser
+
+from mondo.utils import parse_datetime
+
+
+def generate_timestamps(count: int):
+    start = datetime.datetime(2016, 1, 1)
+    timestamps = []
+    for _ in range(count):
+        moment = start + datetime.timedelta(
+            seconds=random.randint(0, 365 * 24 * 3600),
+            milliseconds=random.randint(0, 999))
+        fraction = '{:03d}'.format(moment.microsecond // 1000).rstrip('0')
+        timestamps.append('{:%Y-%m-%dT%H:%M:%S}{}Z'.format(
+            moment, '.' + fraction if fraction else ''))
+    return timestamps
+
+
+def run(count: int = 100000):
+    timestamps = generate_timestamps(count)
+    assert [parse_datetime(t) for t in timestamps[:100]] == [
+        dateutil.parser.parse(t) for t in timestamps[:100]]
+
+    fast = min(timeit.repeat(
+        lambda: [parse_datetime(t) for t in timestamps], number=1, repeat=3))
+    slow = min(timeit.repeat(
+        lambda: [dateutil.parser.parse(t) for t in timestamps],
+        number=1, repeat=3))
+
+    print("{} timestamps".format(count))
+    print("dateutil.parser.parse: {:.3f}s".format(slow))
+    print("parse_datetime:        {:.3f}s".format(fast))
+    print("speed-up:              {:.1f}x".format(slow / fast))
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -1 +1 @@
-from mondo.client import MondoClient
+from mondo.client import AsyncMondoClient, MondoClient
@@ -2,9 +2,17 @@ from collections import namedtuple
 from random import choice
 from string import ascii_uppercase
 from urllib import parse
+import asyncio
+import json
+import logging
+import threading
+import time
 
 import requests
 from mondo.exceptions import MondoApiException
+from mondo.utils import dump_json
+
+logger = logging.getLogger(__name__)
 
 BASE_API_URL = 'https://auth.getmondo.co.uk/?'
 
@@ -44,7 +52,8 @@ def generate_mondo_auth_url(client_id: str, redirect_uri: str,
 def exchange_authorization_code_for_access_token(client_id: str,
                                                  client_secret: str,
                                                  authorization_code: str,
-                                                 redirect_uri: str):
+                                                 redirect_uri: str,
+                                                 session: requests.Session = None):
     """
     Exchange the authorization token for an access token
 
@@ -53,11 +62,12 @@ def exchange_authorization_code_for_access_token(client_id: str,
     :param authorization_code: the authorization code returned by the first lef
                                of the oauth process
     :param redirect_uri: the (mandatory) redirect uri
+    :param session: an optional requests.Session to reuse pooled connections
     :return: A tuple of an access token and a refresh token (if your app is
              a confidential one).
     """
 
-    response = requests.post(
+    response = (session or requests).post(
         url="https://api.getmondo.co.uk/oauth2/token",
         data={
             'grant_type': 'authorization_code',
@@ -74,7 +84,8 @@ def exchange_authorization_code_for_access_token(client_id: str,
     return MondoAccess(**response)
 
 
-def refresh_access_token(client_id: str, client_secret: str, refresh_token: str):
+def refresh_access_token(client_id: str, client_secret: str, refresh_token: str,
+                         session: requests.Session = None):
     """
     Confidential app are allowed to refresh the access token
     in order to make new requests.
@@ -82,9 +93,10 @@ def refresh_access_token(client_id: str, client_secret: str, refresh_token: str)
     :param client_id:
     :param client_secret:
     :param refresh_token:
+    :param session: an optional requests.Session to reuse pooled connections
     :return: a tuple with the new access token and the new refresh token
     """
-    response = requests.post(
+    response = (session or requests).post(
         url="https://api.getmondo.co.uk/oauth2/token",
         data={
             'grant_type': 'refresh_token',
@@ -98,3 +110,140 @@ def refresh_access_token(client_id: str, client_secret: str, refresh_token: str)
         raise MondoApiException(response['error_description'])
 
     return MondoAccess(**response)
+
+
+class TokenManager(object):
+    """
+    Hold an access token and refresh it before it expires: lazily, when
+    the token is read within `refresh_margin` of its expiry, or
+    proactively from a timer thread with background=True.
+
+    Concurrent refreshes (from threads or coroutines) are coalesced into
+    a single request; the tokens can be persisted to a file so that a
+    restarted process picks them up instead of refreshing again.
+    """
+
+    def __init__(self, client_id: str, client_secret: str,
+                 access: MondoAccess, refresh_margin: float = 60,
+                 path: str = None, session: requests.Session = None,
+                 background: bool = False, expires_at: float = None):
+        """
+        :param client_id: the oauth client id
+        :param client_secret: the client secret
+        :param access: the MondoAccess returned by the OAuth dance
+        :param refresh_margin: refresh this many seconds before the expiry
+        :param path: an optional JSON file where to persist the tokens
+        :param session: an optional requests.Session to reuse pooled connections
+        :param background: also refresh proactively from a timer thread
+                           (one per manager: leave it off when managing
+                           many users' tokens, i.e. in a ClientPool)
+        :param expires_at: the expiry timestamp, when the access was
+                           not obtained just now
+        """
+        self._client_id = client_id
+        self._client_secret = client_secret
+        self._refresh_margin = refresh_margin
+        self._path = path
+        self._session = session
+        self._background = background
+        self._lock = threading.Lock()
+        self._timer = None
+        self._pending = None
+        self._set_access(access, expires_at)
+
+    @classmethod
+    def load(cls, client_id: str, client_secret: str, path: str,
+             **kwargs) -> 'TokenManager':
+        """
+        :param path: a JSON file written by a TokenManager
+        :return: a TokenManager holding the persisted tokens
+        """
+        with open(path) as token_file:
+            persisted = json.load(token_file)
+        expires_at = persisted.pop('expires_at')
+        return cls(client_id, client_secret, MondoAccess(**persisted),
+                   path=path, expires_at=expires_at, **kwargs)
+
+    @property
+    def access(self) -> MondoAccess:
+        return self._access
+
+    @property
+    def expires_at(self) -> float:
+        return self._expires_at
+
+    @property
+    def expiring(self) -> bool:
+        return time.time() >= self._expires_at - self._refresh_margin
+
+    @property
+    def access_token(self) -> str:
+        """
+        :return: a valid access token, refreshing it first if it's expiring
+        """
+        access = self._access
+        if self.expiring:
+            access = self.refresh(stale_token=access.access_token)
+        return access.access_token
+
+    def refresh(self, stale_token: str = None) -> MondoAccess:
+        """
+        Refresh the access token
+
+        :param stale_token: only refresh if this is still the current token;
+                            callers waiting on a concurrent refresh then
+                            reuse its result
+        :return: the current MondoAccess
+        """
+        with self._lock:
+            if stale_token is None or stale_token == self._access.access_token:
+                self._set_access(refresh_access_token(
+                    self._client_id, self._client_secret,
+                    self._access.refresh_token, session=self._session))
+            return self._access
+
+    async def refresh_async(self, stale_token: str = None) -> MondoAccess:
+        """
+        Async twin of refresh: the coroutines asking for a refresh
+        at the same time share one request, run in the default executor
+        """
+        if self._pending is None or self._pending.done():
+            loop = asyncio.get_event_loop()
+            self._pending = loop.run_in_executor(
+                None, self.refresh, stale_token)
+        return await asyncio.shield(self._pending)
+
+    def close(self):
+        """
+        Stop the background refresh
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _set_access(self, access: MondoAccess, expires_at: float = None):
+        self._access = access
+        self._expires_at = expires_at or time.time() + float(access.expires_in)
+        if self._path:
+            self._persist()
+        if self._background:
+            self._schedule()
+
+    def _persist(self):
+        dump_json(dict(self._access._asdict(), expires_at=self._expires_at),
+                  self._path)
+
+    def _schedule(self):
+        self.close()
+        delay = max(self._expires_at - self._refresh_margin - time.time(), 0)
+        self._timer = threading.Timer(delay, self._refresh_in_background,
+                                      args=(self._access.access_token,))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _refresh_in_background(self, stale_token: str):
+        try:
+            self.refresh(stale_token=stale_token)
+        except (MondoApiException, requests.RequestException):
+            # the next access_token read will try again
+            logger.exception('Failed to refresh the access token')
@@ -0,0 +1,139 @@
+from collections import OrderedDict
+import datetime
+import threading
+import time
+
+from mondo.mondo import Balance, Transaction, blocking_method
+
+
+class BalanceTracker(object):
+    """
+    Keep the balance of an account up to date locally.
+
+    The tracker is anchored with one /balance call, then follows the
+    transactions it is shown (i.e. from a TransactionStore sync or from a
+    WebhookReceiver handler): each newer transaction carries the resulting
+    account balance, and its amount counts towards today's spending.
+
+    It re-anchors with a full fetch every `reanchor_interval` seconds, and
+    as soon as a transaction doesn't add up with the tracked balance.
+    """
+
+    def __init__(self, client, account_id: str,
+                 reanchor_interval: float = 3600, remember: int = 10000):
+        """
+        :param client: a MondoClient
+        :param account_id: the account to track
+        :param reanchor_interval: max number of seconds between two fetches
+                                  of the balance
+        :param remember: number of recent transaction ids remembered,
+                         to skip the ones seen twice
+        """
+        blocking_method(client, 'get_balance')
+        self._client = client
+        self.account_id = account_id
+        self.reanchor_interval = reanchor_interval
+        self._remember = remember
+        self._lock = threading.RLock()
+        self._seen = OrderedDict()
+        self._balance = None
+        self._spent_today = 0
+        self._currency = None
+        self._day = None
+        self._anchored_at = None   # time.monotonic() of the last fetch
+        self._latest = None        # creation date of the newest transaction
+        self._generated_at = None
+        self.drifted = False
+        self.anchors = 0
+
+    def anchor(self):
+        """
+        Fetch the balance from the API and restart tracking from there
+        """
+        with self._lock:
+            response = self._client.get_balance(self.account_id, raw=True)
+            now = datetime.datetime.now(datetime.timezone.utc)
+            self._balance = response['balance']
+            self._spent_today = response['spend_today']
+            self._currency = response['currency']
+            self._day = now.date()
+            self._latest = now
+            self._generated_at = now
+            self._anchored_at = time.monotonic()
+            self.drifted = False
+            self.anchors += 1
+
+    @property
+    def needs_anchor(self) -> bool:
+        return (self._anchored_at is None or self.drifted or
+                time.monotonic() - self._anchored_at > self.reanchor_interval)
+
+    @property
+    def balance(self) -> Balance:
+        """
+        :return: the tracked Balance, fetching it only when needed
+        """
+        with self._lock:
+            if self.needs_anchor:
+                self.anchor()
+            self._roll_day(datetime.datetime.now(datetime.timezone.utc))
+            return Balance(
+                balance=self._balance, spend_today=self._spent_today,
+                currency=self._currency, generated_at=self._generated_at)
+
+    def apply(self, transaction: Transaction) -> bool:
+        """
+        Update the balance with a transaction of the account.
+        Usable as a WebhookReceiver handler.
+
+        :param transaction: a Transaction
+        :return: True if the transaction changed the tracked balance
+        """
+        with self._lock:
+            if self._anchored_at is None or transaction.id in self._seen:
+                return False
+            self._seen[transaction.id] = True
+            while len(self._seen) > self._remember:
+                self._seen.popitem(last=False)
+
+            # declined transactions don't move money, and the ones
+            # older than the last anchor are already part of it
+            created = transaction.created
+            if transaction.decline_reason or created <= self._latest:
+                return False
+
+            amount = transaction.amount.minor
+            balance = transaction.account_balance.minor
+            if balance != self._balance + amount:
+                # some transactions were missed: trust the API again
+                self.drifted = True
+
+            self._balance = balance
+            self._latest = created
+            self._generated_at = datetime.datetime.now(datetime.timezone.utc)
+            self._roll_day(created)
+            if (amount < 0 and not transaction.is_load and
+                    created.date() == self._day):
+                self._spent_today += amount
+            return True
+
+    def sync(self, store) -> int:
+        """
+        Sync a TransactionStore and apply the new transactions
+
+        :param store: the TransactionStore of the client
+        :return: the number of transactions applied
+        """
+        with self._lock:
+            if self.needs_anchor:
+                self.anchor()
+            store.sync(self.account_id)
+            return sum(
+                self.apply(transaction) for transaction in
+                store.list_transactions(self.account_id, since=self._latest)
+            )
+
+    def _roll_day(self, now: datetime.datetime):
+        if now.date() > self._day:
+            self._day = now.date()
+            self._spent_today = 0
@@ -0,0 +1,130 @@
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List
+import threading
+
+from mondo.mondo import blocking_method
+
+Operation = namedtuple('Operation', ['key', 'method', 'args', 'kwargs'])
+
+OperationResult = namedtuple('OperationResult', [
+    'operation', 'result', 'error'])
+
+
+def annotate_transaction(transaction_id: str, metadata: dict) -> Operation:
+    return Operation(transaction_id, 'annotate_transaction',
+                     (transaction_id, metadata), {})
+
+
+def register_attachment(transaction_id: str, file_url: str,
+                        file_type: str) -> Operation:
+    return Operation(transaction_id, 'register_attachment',
+                     (transaction_id, file_url, file_type), {})
+
+
+def deregister_attachment(attachment_id: str) -> Operation:
+    return Operation(attachment_id, 'deregister_attachment',
+                     (attachment_id,), {})
+
+
+def register_webhook(account_id: str, url: str) -> Operation:
+    return Operation(account_id, 'register_webhook', (account_id, url), {})
+
+
+def delete_webhook(webhook_id: str) -> Operation:
+    return Operation(webhook_id, 'delete_webhook', (webhook_id,), {})
+
+
+class BatchResult(object):
+    def __init__(self, results: List[OperationResult]):
+        self.results = results
+
+    @property
+    def succeeded(self) -> List[OperationResult]:
+        return [result for result in self.results if result.error is None]
+
+    @property
+    def failed(self) -> List[OperationResult]:
+        return [result for result in self.results if result.error is not None]
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def __len__(self):
+        return len(self.results)
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __repr__(self):
+        return "<BatchResult {} operations, {} failed>".format(
+            len(self), len(self.failed))
+
+
+class BatchExecutor(object):
+    """
+    Run a stream of write operations (see the helpers in this module)
+    concurrently against a client.
+
+    Operations sharing the same key (i.e. the same transaction id) run one
+    after the other, in the order they were submitted; operations on
+    different keys run in parallel, up to `concurrency` at a time.
+    """
+
+    def __init__(self, client, concurrency: int = 8, max_pending: int = None):
+        """
+        :param client: a MondoClient
+        :param concurrency: max number of concurrent requests
+        :param max_pending: max number of operations read from the stream
+                            and not yet completed (defaults to
+                            4 * concurrency)
+        """
+        # the operations run in threads: the client must be a blocking one
+        blocking_method(client, 'annotate_transaction')
+        self._client = client
+        self._concurrency = concurrency
+        self._max_pending = max_pending or 4 * concurrency
+
+    def run(self, operations: Iterable[Operation]) -> BatchResult:
+        """
+        :param operations: an iterable of Operation
+        :return: a BatchResult, with one result per operation in input order
+        """
+        results = []
+        waiting = {}  # key -> operations queued behind the running one
+        lock = threading.Lock()
+        pending = threading.BoundedSemaphore(self._max_pending)
+
+        with ThreadPoolExecutor(max_workers=self._concurrency) as executor:
+            def execute(index, operation):
+                try:
+                    result = getattr(self._client, operation.method)(
+                        *operation.args, **operation.kwargs)
+                    results[index] = OperationResult(operation, result, None)
+                except Exception as error:
+                    results[index] = OperationResult(operation, None, error)
+                finally:
+                    with lock:
+                        queue = waiting[operation.key]
+                        if queue:
+                            executor.submit(execute, *queue.popleft())
+                        else:
+                            del waiting[operation.key]
+                    pending.release()
+
+            for index, operation in enumerate(operations):
+                pending.acquire()
+                results.append(None)
+                with lock:
+                    if operation.key in waiting:
+                        waiting[operation.key].append((index, operation))
+                    else:
+                        waiting[operation.key] = deque()
+                        executor.submit(execute, index, operation)
+
+            # wait for the chains of operations to drain before shutting down
+            for _ in range(self._max_pending):
+                pending.acquire()
+
+        return BatchResult(results)
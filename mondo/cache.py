@@ -0,0 +1,183 @@
+from collections import OrderedDict, namedtuple
+import json
+import sqlite3
+import threading
+import time
+
+CacheKey = namedtuple('CacheKey', ['scope', 'path', 'query'])
+
+# Time to live, in seconds, by path prefix (the longest prefix wins)
+DEFAULT_TTLS = {
+    '/ping/whoami': 60,
+    '/accounts': 300,
+    '/balance': 10,
+    '/transactions': 30,
+    '/transactions/': 300,
+    '/webhooks': 300,
+}
+
+# Writes under a path also make stale the GETs under these prefixes
+INVALIDATIONS = {
+    '/attachment': ('/transactions',),
+}
+
+
+class ResponseCache(object):
+    """
+    Base class for the caches of GET responses.
+
+    Subclasses implement `get`, `_set`, `invalidate` and `clear`;
+    the payloads are stored encoded, and every `get` decodes a fresh copy
+    that the caller (or its models) can safely modify.
+    """
+
+    def __init__(self, ttls: dict = None, default_ttl: float = 60):
+        """
+        :param ttls: time to live in seconds by path prefix;
+                     a ttl of 0 disables caching for that prefix
+        :param default_ttl: time to live for the other paths
+        """
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+
+    def ttl_for(self, path: str) -> float:
+        prefixes = [prefix for prefix in self.ttls if path.startswith(prefix)]
+        if not prefixes:
+            return self.default_ttl
+        return self.ttls[max(prefixes, key=len)]
+
+    def set(self, key: CacheKey, value):
+        ttl = self.ttl_for(key.path)
+        if ttl > 0:
+            self._set(key, value, time.time() + ttl)
+
+    def invalidate_after_write(self, path: str):
+        """
+        Drop the cached responses made stale by a write to `path`
+
+        :param path: the URL resource part of a POST/PATCH/PUT/DELETE
+        """
+        root = '/' + path.strip('/').split('/')[0]
+        self.invalidate(root)
+        for prefix in INVALIDATIONS.get(root, ()):
+            self.invalidate(prefix)
+
+    def get(self, key: CacheKey):
+        raise NotImplementedError
+
+    def _set(self, key: CacheKey, value, expires: float):
+        raise NotImplementedError
+
+    def invalidate(self, prefix: str = '/'):
+        raise NotImplementedError
+
+    def clear(self):
+        self.invalidate('/')
+
+
+class LRUCache(ResponseCache):
+    """
+    In-process cache, evicting the least recently used entries
+    past `maxsize`
+    """
+
+    def __init__(self, maxsize: int = 1024, ttls: dict = None,
+                 default_ttl: float = 60):
+        super().__init__(ttls, default_ttl)
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return json.loads(value)
+
+    def _set(self, key: CacheKey, value, expires: float):
+        value = json.dumps(value)
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, prefix: str = '/'):
+        with self._lock:
+            for key in [key for key in self._entries
+                        if key.path.startswith(prefix)]:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache(ResponseCache):
+    """
+    Cache stored in a SQLite file, so that it can be shared
+    between processes
+    """
+
+    def __init__(self, path: str, maxsize: int = 10000, ttls: dict = None,
+                 default_ttl: float = 60):
+        super().__init__(ttls, default_ttl)
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=30, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'scope TEXT NOT NULL, path TEXT NOT NULL, query TEXT NOT NULL, '
+                'expires REAL NOT NULL, used REAL NOT NULL, value TEXT NOT NULL, '
+                'PRIMARY KEY (scope, path, query))'
+            )
+
+    def get(self, key: CacheKey):
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                'SELECT expires, value FROM responses '
+                'WHERE scope = ? AND path = ? AND query = ?', key
+            ).fetchone()
+            if row is None:
+                return None
+            if row[0] < now:
+                self._connection.execute(
+                    'DELETE FROM responses '
+                    'WHERE scope = ? AND path = ? AND query = ?', key)
+                return None
+            self._connection.execute(
+                'UPDATE responses SET used = ? '
+                'WHERE scope = ? AND path = ? AND query = ?', (now,) + key)
+        return json.loads(row[1])
+
+    def _set(self, key: CacheKey, value, expires: float):
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO responses '
+                '(scope, path, query, expires, used, value) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                key + (expires, time.time(), json.dumps(value))
+            )
+            self._connection.execute(
+                'DELETE FROM responses WHERE rowid IN ('
+                'SELECT rowid FROM responses ORDER BY used DESC '
+                'LIMIT -1 OFFSET ?)', (self.maxsize,)
+            )
+
+    def invalidate(self, prefix: str = '/'):
+        with self._lock, self._connection:
+            self._connection.execute(
+                'DELETE FROM responses WHERE substr(path, 1, ?) = ?',
+                (len(prefix), prefix)
+            )
+
+    def close(self):
+        self._connection.close()
@@ -1,10 +1,38 @@
-from typing import List
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Iterable, Iterator, AsyncIterator, Union
+import asyncio
 import datetime
 
+from mondo.export import ExportResult, Schema, TransactionExporter
+from mondo.frame import TransactionFrame
 from mondo.mondo import MondoApi, Account, Balance, Transaction, Attachment, Webhook
+from mondo.store import TransactionStore
+from mondo.utils import format_cursor
+
+Cursor = Union[datetime.datetime, str]
+
+# The API caps the limit of /transactions, whatever was asked for
+MAX_PAGE_SIZE = 100
+
+TransactionResult = namedtuple('TransactionResult', [
+    'id', 'transaction', 'error'])
 
 
 class MondoClient(MondoApi):
+    store = None
+
+    def open_store(self, path: str = ':memory:'):
+        """
+        Attach a local transaction store: once synced,
+        get_transaction and Account.transactions are served from disk
+
+        :param path: the SQLite database file
+        :return: a TransactionStore
+        """
+        self.store = TransactionStore(self, path)
+        return self.store
+
     def whoami(self):
         """
         Check the access token for validity
@@ -13,110 +41,409 @@ class MondoClient(MondoApi):
         """
         return self._make_request('/ping/whoami')
 
+    async def whoami_async(self):
+        """
+        Async twin of whoami
+        """
+        return await self._make_async_request('/ping/whoami', None)
+
     @property
     def default_account(self):
         return self.list_accounts()[0]
 
-    def list_accounts(self) -> List[Account]:
+    async def default_account_async(self) -> Account:
+        return (await self.list_accounts_async())[0]
+
+    def list_accounts(self, raw: bool = False) -> List[Account]:
         """
         List the accounts linked to the user.
         (Mondo only allows one for the moment)
 
+        :param raw: return the decoded payloads instead of Account objects
         :return: an Account object
         """
         response = self._make_request('/accounts')
 
+        if raw:
+            return response['accounts']
+        return [
+            Account(client=self, **account) for account in response['accounts']
+        ]
+
+    async def list_accounts_async(self, raw: bool = False) -> List[Account]:
+        """
+        Async twin of list_accounts
+        """
+        response = await self._make_async_request('/accounts', None)
+
+        if raw:
+            return response['accounts']
         return [
             Account(client=self, **account) for account in response['accounts']
         ]
 
-    def get_balance(self, account_id: str) -> Balance:
+    def get_balance(self, account_id: str, raw: bool = False) -> Balance:
         """
         Get the current balance for the account
 
         :param account_id:
+        :param raw: return the decoded payload instead of a Balance object
         :return: a Balance object
         """
         response = self._make_request('/balance', {'account_id': account_id})
 
+        if raw:
+            return response
         return Balance(generated_at=datetime.datetime.now(), **response)
 
-    async def list_transactions_async(self, account_id: str,
-                                      since: datetime.datetime = None,
-                                      before: datetime.datetime = None,
-                                      limit: int = None):
-        params = {
-            'account_id': account_id,
-        }
-
-        if since:
-            params.update({'since': since.isoformat('T')+'Z'})
-        if before:
-            params.update({'before': before.isoformat('T')+'Z'})
-        if limit:
-            params.update({'limit': str(limit)})
-
-        content = await self._make_async_request('/transactions', params)
+    async def get_balance_async(self, account_id: str,
+                                raw: bool = False) -> Balance:
+        """
+        Async twin of get_balance
+        """
+        response = await self._make_async_request(
+            '/balance', {'account_id': account_id})
 
-        return [
-            Transaction(client=self, **transaction)
-            for transaction in content['transactions']
-        ]
+        if raw:
+            return response
+        return Balance(generated_at=datetime.datetime.now(), **response)
 
     def list_transactions(self, account_id: str,
-                          since: datetime.datetime = None,
+                          since: Cursor = None,
                           before: datetime.datetime = None,
-                          limit: int = None) -> List[Transaction]:
+                          limit: int = None,
+                          raw: bool = False) -> List[Transaction]:
         """
         List recent transactions for the account
 
         :param account_id: account id
         :param before: only list transactions before that date
         :param since: only list transactions after that date
+                      (or after that transaction id)
         :param limit: only show a number of transactions
+        :param raw: return the decoded payloads instead of Transaction objects
         :return: A list of Transaction objects
         """
+        transactions = self._list_transactions_payload(
+            account_id, since, before, limit)
+
+        if raw:
+            return transactions
+        return [
+            Transaction(client=self, **transaction)
+            for transaction in transactions
+        ]
+
+    async def list_transactions_async(self, account_id: str,
+                                      since: Cursor = None,
+                                      before: datetime.datetime = None,
+                                      limit: int = None,
+                                      raw: bool = False) -> List[Transaction]:
+        """
+        Async twin of list_transactions
+        """
+        content = await self._make_async_request(
+            '/transactions',
+            self._transaction_params(account_id, since, before, limit)
+        )
+
+        if raw:
+            return content['transactions']
+        return [
+            Transaction(client=self, **transaction)
+            for transaction in content['transactions']
+        ]
 
+    def _transaction_params(self, account_id: str,
+                            since: Cursor = None,
+                            before: datetime.datetime = None,
+                            limit: int = None) -> dict:
         params = {
             'account_id': account_id,
             'expand[]': 'merchant'
         }
 
         if since:
-            params.update({'since': since.isoformat('T')+'Z'})
+            params.update({'since': format_cursor(since)})
         if before:
-            params.update({'before': before.isoformat('T')+'Z'})
+            params.update({'before': format_cursor(before)})
         if limit:
             params.update({'limit': limit})
 
-        response = self._make_request('/transactions', params)
+        return params
+
+    def _list_transactions_payload(self, account_id: str,
+                                   since: Cursor = None,
+                                   before: datetime.datetime = None,
+                                   limit: int = None) -> List[dict]:
+        return self._make_request(
+            '/transactions',
+            self._transaction_params(account_id, since, before, limit)
+        )['transactions']
+
+    def stream_transactions(self, account_id: str,
+                            since: Cursor = None,
+                            before: datetime.datetime = None,
+                            limit: int = None,
+                            raw: bool = False) -> Iterator[Transaction]:
+        """
+        Like list_transactions, but decode the response incrementally
+        and yield each Transaction as soon as it has been received
 
-        return [
-            Transaction(client=self, **transaction)
-            for transaction in response['transactions']
-        ]
+        :param account_id: account id
+        :param since: only list transactions after that date
+                      (or after that transaction id)
+        :param before: only list transactions before that date
+        :param limit: only show a number of transactions
+        :param raw: yield the decoded payloads instead of Transaction objects
+        :return: an iterator of Transaction objects
+        """
+        for transaction in self._stream_request(
+                '/transactions',
+                self._transaction_params(account_id, since, before, limit),
+                'transactions'):
+            yield transaction if raw else Transaction(
+                client=self, **transaction)
+
+    async def stream_transactions_async(
+            self, account_id: str, since: Cursor = None,
+            before: datetime.datetime = None,
+            limit: int = None,
+            raw: bool = False) -> AsyncIterator[Transaction]:
+        """
+        Async twin of stream_transactions
 
-    async def get_transaction_async(self, transaction_id):
-        content = await self._make_async_request(
-            '/transactions/{}'.format(transaction_id), {'expand[]': 'merchant'}
+        :return: an async iterator of Transaction objects
+        """
+        async for transaction in self._stream_async_request(
+                '/transactions',
+                self._transaction_params(account_id, since, before, limit),
+                'transactions'):
+            yield transaction if raw else Transaction(
+                client=self, **transaction)
+
+    def _iter_transaction_pages(self, account_id: str,
+                                since: Cursor = None,
+                                before: datetime.datetime = None,
+                                page_size: int = 100) -> Iterator[List[dict]]:
+        """
+        Walk the whole transaction history one page at a time,
+        using the id of the last transaction as the cursor for the next page
+
+        :return: an iterator of pages of raw transaction payloads
+        """
+        page_size = min(page_size, MAX_PAGE_SIZE)
+        cursor = since
+        while True:
+            page = self._list_transactions_payload(
+                account_id, since=cursor, before=before, limit=page_size)
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            cursor = page[-1]['id']
+
+    def iter_transactions(self, account_id: str,
+                          since: Cursor = None,
+                          before: datetime.datetime = None,
+                          page_size: int = 100,
+                          raw: bool = False) -> Iterator[Transaction]:
+        """
+        Iterate over all the transactions of the account, oldest first,
+        fetching a new page only when the previous one is exhausted
+
+        :param account_id: account id
+        :param since: start after that date (or after that transaction id)
+        :param before: stop at that date
+        :param page_size: number of transactions to fetch per request,
+                          capped at MAX_PAGE_SIZE
+        :param raw: yield the decoded payloads instead of Transaction objects
+        :return: an iterator of Transaction objects
+        """
+        for page in self._iter_transaction_pages(
+                account_id, since, before, page_size):
+            if raw:
+                yield from page
+                continue
+            for transaction in page:
+                yield Transaction(client=self, **transaction)
+
+    async def iter_transactions_async(
+            self, account_id: str, since: Cursor = None,
+            before: datetime.datetime = None,
+            page_size: int = 100,
+            raw: bool = False) -> AsyncIterator[Transaction]:
+        """
+        Async twin of iter_transactions, built on list_transactions_async
+
+        :param account_id: account id
+        :param since: start after that date (or after that transaction id)
+        :param before: stop at that date
+        :param page_size: number of transactions to fetch per request
+        :param raw: yield the decoded payloads instead of Transaction objects
+        :return: an async iterator of Transaction objects
+        """
+        page_size = min(page_size, MAX_PAGE_SIZE)
+        cursor = since
+        while True:
+            page = await self.list_transactions_async(
+                account_id, since=cursor, before=before, limit=page_size,
+                raw=raw)
+            for transaction in page:
+                yield transaction
+            if len(page) < page_size:
+                return
+            cursor = page[-1]['id'] if raw else page[-1].id
+
+    def transactions_frame(self, account_id: str,
+                           since: Cursor = None,
+                           before: datetime.datetime = None,
+                           page_size: int = 100) -> TransactionFrame:
+        """
+        Fetch the whole transaction history of the account
+        into a columnar TransactionFrame, without building Transaction objects
+
+        :param account_id: account id
+        :param since: start after that date (or after that transaction id)
+        :param before: stop at that date
+        :param page_size: number of transactions to fetch per request
+        :return: a TransactionFrame
+        """
+        return TransactionFrame.from_payload(
+            transaction
+            for page in self._iter_transaction_pages(
+                account_id, since, before, page_size)
+            for transaction in page
         )
 
-        return Transaction(client=self, **content['transaction'])
+    def export_transactions(self, account_id: str, path: str,
+                            format: str = 'csv', schema: Schema = None,
+                            page_size: int = 100, chunk_size: int = 1000,
+                            **kwargs) -> ExportResult:
+        """
+        Write the whole transaction history of the account to a CSV,
+        JSON Lines or columnar file, in constant memory and resuming
+        from the last exported transaction (see TransactionExporter)
 
-    def get_transaction(self, transaction_id: str) -> Transaction:
+        :param account_id: account id
+        :param path: the output file
+        :param format: csv, jsonl or columnar
+        :param schema: the flattening Schema, defaults to DEFAULT_SCHEMA
+        :param page_size: number of transactions to fetch per request
+        :param chunk_size: number of rows written at once
+        :return: an ExportResult
+        """
+        return TransactionExporter(
+            self, schema, page_size, chunk_size
+        ).export(account_id, path, format, **kwargs)
+
+    async def transactions_frame_async(
+            self, account_id: str, since: Cursor = None,
+            before: datetime.datetime = None,
+            page_size: int = 100) -> TransactionFrame:
+        """
+        Async twin of transactions_frame
+        """
+        return TransactionFrame.from_payload([
+            transaction async for transaction in self.iter_transactions_async(
+                account_id, since, before, page_size, raw=True)
+        ])
+
+    def get_transaction(self, transaction_id: str,
+                        raw: bool = False) -> Transaction:
         """
         Get details on a specific transaction
 
         :param transaction_id: Transaction.id as returned by a list
+        :param raw: return the decoded payload instead of a Transaction
         :return: a Transaction
         """
+        if self.store is not None:
+            transaction = self.store.get_transaction(transaction_id, raw=raw)
+            if transaction is not None:
+                return transaction
+
         response = self._make_request(
             '/transactions/{}'.format(transaction_id),
             {'expand[]': 'merchant'}
         )
 
+        if raw:
+            return response['transaction']
         return Transaction(client=self, **response['transaction'])
 
+    async def get_transaction_async(self, transaction_id: str,
+                                    raw: bool = False) -> Transaction:
+        """
+        Async twin of get_transaction
+        """
+        if self.store is not None:
+            transaction = self.store.get_transaction(transaction_id, raw=raw)
+            if transaction is not None:
+                return transaction
+
+        response = await self._make_async_request(
+            '/transactions/{}'.format(transaction_id),
+            {'expand[]': 'merchant'}
+        )
+
+        if raw:
+            return response['transaction']
+        return Transaction(client=self, **response['transaction'])
+
+    def get_transactions(self, transaction_ids: Iterable[str],
+                         concurrency: int = 10,
+                         raw: bool = False) -> List[TransactionResult]:
+        """
+        Get many transactions at once, with at most `concurrency` requests
+        in flight over the client's connection pool (so keep pool_size
+        at least as big as concurrency)
+
+        :param transaction_ids: the transaction ids
+        :param concurrency: max number of concurrent requests
+        :param raw: fetch the decoded payloads instead of Transaction objects
+        :return: a list of TransactionResult, in the same order as the ids;
+                 failed fetches carry the exception in `error`
+        """
+        def fetch(transaction_id):
+            try:
+                return TransactionResult(
+                    transaction_id,
+                    self.get_transaction(transaction_id, raw=raw), None)
+            except Exception as error:
+                return TransactionResult(transaction_id, None, error)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(fetch, transaction_ids))
+
+    async def get_transactions_async(
+            self, transaction_ids: Iterable[str],
+            concurrency: int = 10,
+            raw: bool = False) -> List[TransactionResult]:
+        """
+        Async twin of get_transactions, sharing the client's aiohttp session
+
+        :param transaction_ids: the transaction ids
+        :param concurrency: max number of concurrent requests
+        :param raw: fetch the decoded payloads instead of Transaction objects
+        :return: a list of TransactionResult, in the same order as the ids
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(transaction_id):
+            async with semaphore:
+                try:
+                    return TransactionResult(
+                        transaction_id,
+                        await self.get_transaction_async(
+                            transaction_id, raw=raw), None)
+                except Exception as error:
+                    return TransactionResult(transaction_id, None, error)
+
+        return await asyncio.gather(*[
+            fetch(transaction_id) for transaction_id in transaction_ids
+        ])
+
     def annotate_transaction(self, transaction_id: str, metadata: dict) -> Transaction:
         """
         Add metadata to a transaction.
@@ -126,13 +453,23 @@ class MondoClient(MondoApi):
         :param metadata: a dictionary of metadata
         :return: a Transaction object
         """
-        metadata = {'metadata[{}]'.format(key): value
-                    for key, value in metadata.items()}
-
         response = self._make_request(
             '/transactions/{}'.format(transaction_id),
             method='PATCH',
-            data=metadata
+            data=_metadata_form(metadata)
+        )
+
+        return Transaction(client=self, **response['transaction'])
+
+    async def annotate_transaction_async(self, transaction_id: str,
+                                         metadata: dict) -> Transaction:
+        """
+        Async twin of annotate_transaction
+        """
+        response = await self._make_async_request(
+            '/transactions/{}'.format(transaction_id), None,
+            method='PATCH',
+            data=_metadata_form(metadata)
         )
 
         return Transaction(client=self, **response['transaction'])
@@ -147,11 +484,13 @@ class MondoClient(MondoApi):
         """
         raise NotImplementedError
 
-    def list_webhooks(self, account_id: str) -> List[Webhook]:
+    def list_webhooks(self, account_id: str,
+                      raw: bool = False) -> List[Webhook]:
         """
         List webhooks currently associated to the account
 
         :param account_id: account id
+        :param raw: return the decoded payloads instead of Webhook objects
         :return: a json list of webhooks (might be objects? TODO)
         """
         response = self._make_request(
@@ -161,6 +500,22 @@ class MondoClient(MondoApi):
             }
         )
 
+        if raw:
+            return response['webhooks']
+        return [
+            Webhook(client=self, **webhook) for webhook in response['webhooks']
+        ]
+
+    async def list_webhooks_async(self, account_id: str,
+                                  raw: bool = False) -> List[Webhook]:
+        """
+        Async twin of list_webhooks
+        """
+        response = await self._make_async_request(
+            '/webhooks', {'account_id': account_id})
+
+        if raw:
+            return response['webhooks']
         return [
             Webhook(client=self, **webhook) for webhook in response['webhooks']
         ]
@@ -185,6 +540,22 @@ class MondoClient(MondoApi):
 
         return Webhook(client=self, **response['webhook'])
 
+    async def register_webhook_async(self, account_id: str,
+                                     url: str) -> Webhook:
+        """
+        Async twin of register_webhook
+        """
+        response = await self._make_async_request(
+            '/webhooks', None,
+            method='POST',
+            data={
+                'account_id': account_id,
+                'url': url
+            }
+        )
+
+        return Webhook(client=self, **response['webhook'])
+
     def delete_webhook(self, webhook_id: str) -> dict:
         """
         Delete a webhook
@@ -198,6 +569,14 @@ class MondoClient(MondoApi):
         )
         return {}
 
+    async def delete_webhook_async(self, webhook_id: str) -> dict:
+        """
+        Async twin of delete_webhook
+        """
+        await self._make_async_request(
+            '/webhooks/{}'.format(webhook_id), None, method='DELETE')
+        return {}
+
     def register_attachment(self, transaction_id: str, file_url: str,
                             file_type: str) -> Attachment:
         """
@@ -220,6 +599,24 @@ class MondoClient(MondoApi):
 
         return Attachment(client=self, **response['attachment'])
 
+    async def register_attachment_async(self, transaction_id: str,
+                                        file_url: str,
+                                        file_type: str) -> Attachment:
+        """
+        Async twin of register_attachment
+        """
+        response = await self._make_async_request(
+            '/attachment/register', None,
+            method='POST',
+            data={
+                'external_id': transaction_id,
+                'file_type': file_type,
+                'file_url': file_url
+            }
+        )
+
+        return Attachment(client=self, **response['attachment'])
+
     def deregister_attachment(self, attachment_id) -> dict:
         """
         Delete an attachment
@@ -236,3 +633,59 @@ class MondoClient(MondoApi):
         )
 
         return {}
+
+    async def deregister_attachment_async(self, attachment_id) -> dict:
+        """
+        Async twin of deregister_attachment
+        """
+        await self._make_async_request(
+            '/attachment/deregister', None,
+            method='POST',
+            data={
+                'id': attachment_id
+            }
+        )
+
+        return {}
+
+
+class AsyncMondoClient(MondoClient):
+    """
+    A MondoClient for asyncio services: every API method is a coroutine
+    (an async iterator for iter_transactions and stream_transactions),
+    without the _async suffix.
+
+        async with AsyncMondoClient(token) as client:
+            account = await client.default_account
+            balance = await account.get_balance_async()
+
+    The _async methods are still available; the entities it returns
+    have _async methods as well.
+    """
+    whoami = MondoClient.whoami_async
+    list_accounts = MondoClient.list_accounts_async
+    get_balance = MondoClient.get_balance_async
+    list_transactions = MondoClient.list_transactions_async
+    stream_transactions = MondoClient.stream_transactions_async
+    iter_transactions = MondoClient.iter_transactions_async
+    transactions_frame = MondoClient.transactions_frame_async
+    get_transaction = MondoClient.get_transaction_async
+    get_transactions = MondoClient.get_transactions_async
+    annotate_transaction = MondoClient.annotate_transaction_async
+    list_webhooks = MondoClient.list_webhooks_async
+    register_webhook = MondoClient.register_webhook_async
+    delete_webhook = MondoClient.delete_webhook_async
+    register_attachment = MondoClient.register_attachment_async
+    deregister_attachment = MondoClient.deregister_attachment_async
+
+    @property
+    def default_account(self):
+        """
+        :return: an awaitable of the first Account
+        """
+        return self.default_account_async()
+
+
+def _metadata_form(metadata: dict) -> dict:
+    return {'metadata[{}]'.format(key): value
+            for key, value in metadata.items()}
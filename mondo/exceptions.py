@@ -1,2 +1,4 @@
 class MondoApiException(Exception):
-    pass
+    def __init__(self, message=None, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
@@ -0,0 +1,268 @@
+from collections import namedtuple
+from typing import Callable, Iterator, List
+import csv
+import gzip
+import io
+import json
+import os
+
+from mondo.utils import dump_json, format_cursor
+
+# Columns of the flattened transaction rows: a dotted path into the payload
+# (through lists too, i.e. attachments.file_url) or a (name, function) tuple.
+# Amounts are in minor units, as returned by the API.
+DEFAULT_SCHEMA = [
+    'id', 'created', 'settled', 'description', 'amount', 'currency',
+    'local_amount', 'local_currency', 'account_balance', 'category',
+    'is_load', 'decline_reason', 'notes',
+    'merchant.id', 'merchant.group_id', 'merchant.name', 'merchant.category',
+    'merchant.address.city', 'merchant.address.postcode',
+    'merchant.address.country', 'merchant.address.latitude',
+    'merchant.address.longitude',
+    'metadata',
+    'attachments.file_url',
+]
+
+ExportResult = namedtuple('ExportResult', ['rows', 'cursor', 'resumed'])
+
+
+def resolve(payload, path: str):
+    """
+    :param payload: a decoded transaction (or any nested dict)
+    :param path: a dotted path, i.e. merchant.address.city
+    :return: the value, None if missing; a list if the path goes
+             through a list
+    """
+    value = payload
+    parts = path.split('.')
+    for index, part in enumerate(parts):
+        if isinstance(value, list):
+            rest = '.'.join(parts[index:])
+            return [resolve(item, rest) for item in value]
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+class Schema(object):
+    """
+    Turns transaction payloads into flat rows
+    """
+
+    def __init__(self, columns: List = None):
+        """
+        :param columns: dotted paths or (name, function) tuples,
+                        defaults to DEFAULT_SCHEMA
+        """
+        self._getters = []
+        self.names = []
+        for column in columns or DEFAULT_SCHEMA:
+            if isinstance(column, str):
+                self.names.append(column)
+                self._getters.append(
+                    lambda payload, path=column: resolve(payload, path))
+            else:
+                name, getter = column
+                self.names.append(name)
+                self._getters.append(getter)
+
+    def row(self, payload: dict) -> list:
+        return [getter(payload) for getter in self._getters]
+
+
+def flat(value):
+    """
+    :return: the value as a single CSV cell: lists joined by |,
+             dicts as JSON, None as empty
+    """
+    if value is None:
+        return ''
+    if isinstance(value, dict):
+        return json.dumps(value, sort_keys=True)
+    if isinstance(value, list):
+        return '|'.join(str(flat(item)) for item in value)
+    return value
+
+
+class CSVWriter(object):
+    def __init__(self, names: List[str]):
+        self.names = names
+
+    def header(self) -> bytes:
+        return self.encode([self.names])
+
+    def encode(self, rows: List[list]) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        for row in rows:
+            writer.writerow([flat(value) for value in row])
+        return buffer.getvalue().encode('utf-8')
+
+
+class JSONLinesWriter(object):
+    def __init__(self, names: List[str]):
+        self.names = names
+
+    def header(self) -> bytes:
+        return b''
+
+    def encode(self, rows: List[list]) -> bytes:
+        return ''.join(
+            json.dumps(dict(zip(self.names, row)), ensure_ascii=False) + '\n'
+            for row in rows
+        ).encode('utf-8')
+
+
+class ColumnarWriter(object):
+    """
+    Every chunk is a separate gzip member holding one JSON line,
+    {"rows": n, "columns": {name: [values]}}, so the file can be appended
+    to and read back one block at a time (see read_columnar)
+    """
+
+    def __init__(self, names: List[str]):
+        self.names = names
+
+    def header(self) -> bytes:
+        return b''
+
+    def encode(self, rows: List[list]) -> bytes:
+        block = {
+            'rows': len(rows),
+            'columns': {
+                name: [row[index] for row in rows]
+                for index, name in enumerate(self.names)
+            },
+        }
+        return gzip.compress(
+            (json.dumps(block, ensure_ascii=False) + '\n').encode('utf-8'))
+
+
+WRITERS = {
+    'csv': CSVWriter,
+    'jsonl': JSONLinesWriter,
+    'columnar': ColumnarWriter,
+}
+
+
+def read_columnar(path: str) -> Iterator[dict]:
+    """
+    Read back a columnar export, one block at a time
+
+    :return: an iterator of row dicts
+    """
+    # gzip reads the concatenated members as a single stream
+    with gzip.open(path, 'rt', encoding='utf-8') as blocks:
+        for line in blocks:
+            columns = json.loads(line)['columns']
+            for values in zip(*columns.values()):
+                yield dict(zip(columns, values))
+
+
+class TransactionExporter(object):
+    """
+    Export the whole transaction history of an account to a file,
+    in constant memory: pages are fetched one at a time and written
+    every `chunk_size` rows.
+
+    After each chunk the cursor (the last exported transaction id) and
+    the size of the file are saved to a state file, so that an interrupted
+    export resumes where it stopped, and a later run only appends the
+    new transactions.
+    """
+
+    def __init__(self, client, schema: Schema = None, page_size: int = 100,
+                 chunk_size: int = 1000):
+        """
+        :param client: the MondoClient to fetch the transactions with
+        :param schema: the flattening Schema, defaults to DEFAULT_SCHEMA
+        :param page_size: number of transactions to fetch per request
+        :param chunk_size: number of rows written at once
+        """
+        self._client = client
+        self.schema = schema or Schema()
+        self.page_size = page_size
+        self.chunk_size = chunk_size
+
+    def export(self, account_id: str, path: str, format: str = 'csv',
+               state_path: str = None, since=None, before=None,
+               on_chunk: Callable = None) -> ExportResult:
+        """
+        :param account_id: account id
+        :param path: the output file
+        :param format: csv, jsonl or columnar
+        :param state_path: the resume state, defaults to path + '.state'
+        :param since: start after that date or transaction id
+                      (ignored when resuming)
+        :param before: stop at that date
+        :param on_chunk: called with the number of rows written so far
+                         after each chunk
+        :return: an ExportResult with the number of rows written by this
+                 run, the last exported transaction id and whether the
+                 export was resumed
+        """
+        if format not in WRITERS:
+            raise ValueError('Unknown export format {!r}'.format(format))
+        writer = WRITERS[format](self.schema.names)
+        state_path = state_path or path + '.state'
+        state = self._load_state(state_path, account_id, format)
+        resumed = state is not None and os.path.exists(path)
+
+        if resumed:
+            output = open(path, 'r+b')
+            # drop whatever was written after the last saved chunk
+            output.truncate(state['size'])
+            output.seek(state['size'])
+            cursor = state['cursor']
+        else:
+            output = open(path, 'wb')
+            output.write(writer.header())
+            cursor = format_cursor(since)
+
+        rows = []
+        written = 0
+        with output:
+            for page in self._client._iter_transaction_pages(
+                    account_id, since=cursor, before=before,
+                    page_size=self.page_size):
+                rows.extend(self.schema.row(payload) for payload in page)
+                cursor = page[-1]['id']
+                if len(rows) >= self.chunk_size:
+                    written += self._write(output, writer, rows, cursor,
+                                           state_path, account_id, format)
+                    rows = []
+                    if on_chunk:
+                        on_chunk(written)
+            if rows or not resumed:
+                written += self._write(output, writer, rows, cursor,
+                                       state_path, account_id, format)
+        return ExportResult(written, cursor, resumed)
+
+    def _write(self, output, writer, rows: List[list], cursor: str,
+               state_path: str, account_id: str, format: str) -> int:
+        if rows:
+            output.write(writer.encode(rows))
+        output.flush()
+        os.fsync(output.fileno())
+        dump_json({
+            'account_id': account_id,
+            'format': format,
+            'columns': self.schema.names,
+            'cursor': cursor,
+            'size': output.tell(),
+        }, state_path)
+        return len(rows)
+
+    def _load_state(self, state_path: str, account_id: str,
+                    format: str) -> dict:
+        if not os.path.exists(state_path):
+            return None
+        with open(state_path) as state_file:
+            state = json.load(state_file)
+        if (state['account_id'], state['format'], state['columns']) != (
+                account_id, format, self.schema.names):
+            raise ValueError(
+                'The export state in {} belongs to another account, format '
+                'or schema: remove it to start over'.format(state_path))
+        return state
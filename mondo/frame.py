@@ -0,0 +1,223 @@
+from array import array
+from itertools import compress
+from typing import Iterable
+import datetime
+
+from mondo.utils import as_utc, parse_datetime
+
+SECONDS_PER_DAY = 86400
+EPOCH = datetime.date(1970, 1, 1)
+
+
+class Vocabulary(object):
+    """
+    Maps the repeated values of a column (categories, merchants, currencies)
+    to small integer codes
+    """
+    __slots__ = ('values', '_codes')
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def encode(self, value) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def code(self, value) -> int:
+        return self._codes.get(value, -1)
+
+    def __len__(self):
+        return len(self.values)
+
+
+class TransactionFrame(object):
+    """
+    A columnar view of a list of transactions, built straight from the
+    API payload without going through the Transaction objects:
+
+    - amounts are stored in pence in an int64 array
+    - created timestamps are stored as seconds since the epoch
+    - category, merchant id and currency are stored as vocabulary codes
+    """
+    CATEGORICAL = ('category', 'merchant', 'currency')
+
+    def __init__(self, ids=None, amounts=None, created=None, codes=None,
+                 vocabularies=None):
+        self.ids = ids if ids is not None else []
+        self.amounts = amounts if amounts is not None else array('q')
+        self.created = created if created is not None else array('d')
+        self.codes = codes or {
+            column: array('l') for column in self.CATEGORICAL
+        }
+        self.vocabularies = vocabularies or {
+            column: Vocabulary() for column in self.CATEGORICAL
+        }
+
+    @classmethod
+    def from_response(cls, response: dict) -> 'TransactionFrame':
+        """
+        :param response: a decoded /transactions response
+        :return: a TransactionFrame
+        """
+        return cls.from_payload(response['transactions'])
+
+    @classmethod
+    def from_payload(cls, transactions: Iterable[dict]) -> 'TransactionFrame':
+        """
+        :param transactions: an iterable of raw transaction payloads
+        :return: a TransactionFrame
+        """
+        frame = cls()
+        categories = frame.vocabularies['category']
+        merchants = frame.vocabularies['merchant']
+        currencies = frame.vocabularies['currency']
+        category_codes = frame.codes['category']
+        merchant_codes = frame.codes['merchant']
+        currency_codes = frame.codes['currency']
+
+        for transaction in transactions:
+            merchant = transaction.get('merchant')
+            if isinstance(merchant, dict):
+                merchant = merchant['id']
+
+            frame.ids.append(transaction['id'])
+            frame.amounts.append(transaction['amount'])
+            frame.created.append(
+                parse_datetime(transaction['created']).timestamp())
+            category_codes.append(categories.encode(transaction['category']))
+            merchant_codes.append(merchants.encode(merchant))
+            currency_codes.append(currencies.encode(transaction['currency']))
+
+        return frame
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __repr__(self):
+        return "<TransactionFrame {} transactions>".format(len(self))
+
+    def column(self, name: str) -> list:
+        """
+        Decode a categorical column
+
+        :param name: one of category, merchant, currency
+        :return: the list of values
+        """
+        values = self.vocabularies[name].values
+        return [values[code] for code in self.codes[name]]
+
+    def sum(self) -> int:
+        """
+        :return: the total amount, in pence
+        """
+        return sum(self.amounts)
+
+    def take(self, mask: Iterable[bool]) -> 'TransactionFrame':
+        """
+        Select the rows where mask is true
+
+        :param mask: an iterable of booleans, one per row
+        :return: a new TransactionFrame sharing the vocabularies
+        """
+        mask = list(mask)
+        return TransactionFrame(
+            ids=list(compress(self.ids, mask)),
+            amounts=array('q', compress(self.amounts, mask)),
+            created=array('d', compress(self.created, mask)),
+            codes={
+                column: array('l', compress(codes, mask))
+                for column, codes in self.codes.items()
+            },
+            vocabularies=self.vocabularies
+        )
+
+    def filter(self, category: str = None, merchant: str = None,
+               currency: str = None, since: datetime.datetime = None,
+               before: datetime.datetime = None,
+               spending: bool = None) -> 'TransactionFrame':
+        """
+        Select the rows matching every given condition
+
+        :param category: only this category
+        :param merchant: only this merchant id
+        :param currency: only this currency
+        :param since: only transactions created at or after that date
+                      (naive datetimes are taken as UTC)
+        :param before: only transactions created before that date
+        :param spending: only negative (True) or positive (False) amounts
+        :return: a new TransactionFrame
+        """
+        mask = [True] * len(self)
+        for column, value in (('category', category), ('merchant', merchant),
+                              ('currency', currency)):
+            if value is not None:
+                code = self.vocabularies[column].code(value)
+                mask = [m and c == code
+                        for m, c in zip(mask, self.codes[column])]
+        if since is not None:
+            start = as_utc(since).timestamp()
+            mask = [m and t >= start for m, t in zip(mask, self.created)]
+        if before is not None:
+            end = as_utc(before).timestamp()
+            mask = [m and t < end for m, t in zip(mask, self.created)]
+        if spending is not None:
+            mask = [m and (a < 0) == spending
+                    for m, a in zip(mask, self.amounts)]
+        return self.take(mask)
+
+    def group_by(self, column: str) -> dict:
+        """
+        Sum the amounts by category, merchant or currency
+
+        :param column: one of category, merchant, currency
+        :return: a dict of value -> total amount in pence
+        """
+        values = self.vocabularies[column].values
+        totals = [0] * len(values)
+        for code, amount in zip(self.codes[column], self.amounts):
+            totals[code] += amount
+        # the vocabulary is shared with the parent frame when filtered
+        present = sorted(set(self.codes[column]))
+        return {values[code]: totals[code] for code in present}
+
+    def count_by(self, column: str) -> dict:
+        """
+        :param column: one of category, merchant, currency
+        :return: a dict of value -> number of transactions
+        """
+        vocabulary = self.vocabularies[column]
+        counts = [0] * len(vocabulary)
+        for code in self.codes[column]:
+            counts[code] += 1
+        return {
+            value: count for value, count in zip(vocabulary.values, counts)
+            if count
+        }
+
+    def bucket(self, period: str = 'day') -> dict:
+        """
+        Sum the amounts by (UTC) date bucket
+
+        :param period: one of day, week, month
+        :return: a dict of bucket start date -> total amount in pence
+        """
+        days = {}
+        for timestamp, amount in zip(self.created, self.amounts):
+            day = int(timestamp // SECONDS_PER_DAY)
+            days[day] = days.get(day, 0) + amount
+
+        totals = {}
+        for day, amount in sorted(days.items()):
+            date = EPOCH + datetime.timedelta(days=day)
+            if period == 'week':
+                date -= datetime.timedelta(days=date.weekday())
+            elif period == 'month':
+                date = date.replace(day=1)
+            elif period != 'day':
+                raise ValueError('Unknown period {}'.format(period))
+            totals[date] = totals.get(date, 0) + amount
+        return totals
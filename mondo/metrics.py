@@ -0,0 +1,259 @@
+from bisect import bisect_left
+from collections import OrderedDict, namedtuple
+from typing import Callable, Dict, List
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+RequestEvent = namedtuple('RequestEvent', [
+    'endpoint', 'method', 'status', 'bytes', 'ttfb', 'elapsed', 'retries',
+    'error'
+])
+RequestEvent.__doc__ = """
+One API request, retries included
+
+:param endpoint: the URL template, i.e. /transactions/{id}
+:param method: the HTTP method
+:param status: the final HTTP status, None on connection errors
+:param bytes: the size of the response body
+:param ttfb: seconds until the final response headers were received
+:param elapsed: seconds until the body was fully read (or the error raised)
+:param retries: number of retries before the final response
+:param error: the name of the raised exception, if any
+"""
+
+# the path segments that are part of the endpoint, and not ids
+LITERAL_SEGMENTS = frozenset(['whoami', 'upload', 'register', 'deregister'])
+
+# in seconds, from a cache hit on a local network to a slow /transactions
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def endpoint_template(url: str) -> str:
+    """
+    :param url: the URL resource part, i.e. /transactions/tx_00009
+    :return: the endpoint it belongs to, i.e. /transactions/{id}
+    """
+    segments = url.split('?', 1)[0].strip('/').split('/')
+    return '/' + '/'.join(
+        segment if index == 0 or segment in LITERAL_SEGMENTS else '{id}'
+        for index, segment in enumerate(segments)
+    )
+
+
+class RequestTimer(object):
+    """
+    Collects the timings of a request while it is being sent and retried
+    """
+    __slots__ = ('endpoint', 'method', 'started', 'ttfb', 'status', 'retries')
+
+    def __init__(self, url: str, method: str):
+        self.endpoint = endpoint_template(url)
+        self.method = method
+        self.started = time.perf_counter()
+        self.ttfb = None
+        self.status = None
+        self.retries = 0
+
+    def response(self, status: int, ttfb: float = None):
+        """
+        :param status: the HTTP status of the received response
+        :param ttfb: seconds since the start, defaults to now
+        """
+        self.status = status
+        self.ttfb = time.perf_counter() - self.started if ttfb is None \
+            else ttfb
+
+    def event(self, size: int = 0, error: Exception = None) -> RequestEvent:
+        return RequestEvent(
+            self.endpoint, self.method, self.status, size, self.ttfb,
+            time.perf_counter() - self.started, self.retries,
+            type(error).__name__ if error is not None else None)
+
+
+class Histogram(object):
+    """
+    Counts of the observed values per bucket (upper bound inclusive)
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, fraction: float) -> float:
+        """
+        :param fraction: i.e. 0.99
+        :return: the upper bound of the bucket holding that quantile
+                 (inf if it's beyond the last bucket)
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def cumulative(self) -> List:
+        """
+        :return: a list of (upper bound, count of values <= bound)
+        """
+        result = []
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += count
+            result.append((bound, seen))
+        return result
+
+
+class EndpointStats(object):
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes = 0
+        self.statuses = {}
+        self.elapsed = Histogram(buckets)
+        self.ttfb = Histogram(buckets)
+
+    def record(self, event: RequestEvent):
+        self.requests += 1
+        self.retries += event.retries
+        self.bytes += event.bytes or 0
+        self.statuses[event.status] = self.statuses.get(event.status, 0) + 1
+        if event.error is not None:
+            self.errors += 1
+        self.elapsed.observe(event.elapsed)
+        if event.ttfb is not None:
+            self.ttfb.observe(event.ttfb)
+
+
+class Metrics(object):
+    """
+    In-process counters and latency histograms per (endpoint, method),
+    fed with the RequestEvents of the clients it is given to.
+
+    One instance can be shared by many clients (and threads); the events
+    are also passed on to the registered hooks.
+    """
+
+    def __init__(self, hooks: List[Callable] = None,
+                 buckets=LATENCY_BUCKETS):
+        """
+        :param hooks: functions called with every RequestEvent
+        :param buckets: the upper bounds of the latency histograms
+        """
+        self._hooks = list(hooks or [])
+        self._buckets = buckets
+        self._lock = threading.Lock()
+        self._stats = OrderedDict()
+
+    def add_hook(self, hook: Callable):
+        """
+        :param hook: a function called with every RequestEvent
+        """
+        self._hooks.append(hook)
+        return hook
+
+    def record(self, event: RequestEvent):
+        key = (event.endpoint, event.method)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = EndpointStats(self._buckets)
+            stats.record(event)
+        for hook in self._hooks:
+            try:
+                hook(event)
+            except Exception:
+                logger.exception('Request hook %r failed', hook)
+
+    def __getitem__(self, key) -> EndpointStats:
+        """
+        :param key: an (endpoint, method) tuple
+        """
+        return self._stats[key]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self) -> Dict:
+        """
+        :return: a JSON serialisable dict of "METHOD /endpoint" -> stats
+        """
+        with self._lock:
+            return OrderedDict(
+                ('{} {}'.format(method, endpoint), {
+                    'requests': stats.requests,
+                    'errors': stats.errors,
+                    'retries': stats.retries,
+                    'bytes': stats.bytes,
+                    'statuses': {str(status): count for status, count
+                                 in stats.statuses.items()},
+                    'elapsed_sum': stats.elapsed.sum,
+                    'elapsed_p50': stats.elapsed.quantile(0.5),
+                    'elapsed_p99': stats.elapsed.quantile(0.99),
+                    'ttfb_p50': stats.ttfb.quantile(0.5),
+                    'ttfb_p99': stats.ttfb.quantile(0.99),
+                })
+                for (endpoint, method), stats in self._stats.items()
+            )
+
+    def prometheus(self, prefix: str = 'mondo') -> str:
+        """
+        :return: the metrics in the Prometheus text exposition format
+        """
+        lines = []
+
+        def add(name, kind, help_text, samples):
+            lines.append('# HELP {}_{} {}'.format(prefix, name, help_text))
+            lines.append('# TYPE {}_{} {}'.format(prefix, name, kind))
+            for suffix, labels, value in samples:
+                lines.append('{}_{}{}{{{}}} {}'.format(
+                    prefix, name, suffix, ','.join(
+                        '{}="{}"'.format(k, v) for k, v in labels), value))
+
+        with self._lock:
+            items = [
+                ((('endpoint', endpoint), ('method', method)), stats)
+                for (endpoint, method), stats in self._stats.items()
+            ]
+            add('requests_total', 'counter', 'Requests by final status', [
+                ('', labels + (('status', status),), count)
+                for labels, stats in items
+                for status, count in stats.statuses.items()
+            ])
+            add('request_errors_total', 'counter', 'Failed requests',
+                [('', labels, stats.errors) for labels, stats in items])
+            add('request_retries_total', 'counter', 'Retried attempts',
+                [('', labels, stats.retries) for labels, stats in items])
+            add('response_bytes_total', 'counter', 'Response body bytes',
+                [('', labels, stats.bytes) for labels, stats in items])
+            for name, attribute, help_text in (
+                    ('request_duration_seconds', 'elapsed',
+                     'Time until the body was read'),
+                    ('request_ttfb_seconds', 'ttfb',
+                     'Time until the response headers')):
+                samples = []
+                for labels, stats in items:
+                    histogram = getattr(stats, attribute)
+                    samples.extend(
+                        ('_bucket', labels + (('le', '+Inf' if bound == float(
+                            'inf') else bound),), count)
+                        for bound, count in histogram.cumulative())
+                    samples.append(('_sum', labels, histogram.sum))
+                    samples.append(('_count', labels, histogram.count))
+                add(name, 'histogram', help_text, samples)
+        return '\n'.join(lines) + '\n'
@@ -1,81 +1,548 @@
 from decimal import Decimal as D
+from functools import total_ordering
+from typing import AsyncIterator, Iterator
 
-import datetime
-
+from urllib import parse
 import asyncio
+import datetime
+import hashlib
+import inspect
+import json
+import sys
+import threading
+import time
+import weakref
 
 import aiohttp
-import dateutil.parser
 import requests
 
-from mondo import authorization
+from mondo import authorization, utils
+from mondo.cache import CacheKey, ResponseCache
 from mondo.exceptions import MondoApiException
-from mondo.utils import build_url
+from mondo.metrics import Metrics, RequestTimer
+from mondo.retry import RetryPolicy, TokenBucket, parse_retry_after
+from mondo.streaming import JSONArrayStream
+from mondo.utils import build_url, build_session, parse_datetime
+
+
+def blocking_method(client, name: str):
+    """
+    :param client: a MondoClient
+    :param name: the name of one of its API methods
+    :return: the method, if it's a plain blocking one
+    :raise TypeError: for the coroutines of an AsyncMondoClient, whose
+                      results would be silently dropped without an await
+    """
+    method = getattr(client, name)
+    if inspect.iscoroutinefunction(method) or \
+            inspect.isasyncgenfunction(method):
+        raise TypeError(
+            '{}.{} is asynchronous: use the _async helpers instead'.format(
+                type(client).__name__, name))
+    return method
+
+
+def _error_message(text: str, default: str) -> str:
+    try:
+        return json.loads(text)['message']
+    except (ValueError, KeyError, TypeError):
+        return text or default
 
 
 class MondoApi(object):
     BASE_API_URL = 'https://api.getmondo.co.uk'
 
-    def __init__(self, access_token: str):
+    def __init__(self, access_token: str = None,
+                 session: requests.Session = None, pool_size: int = 10,
+                 async_session: aiohttp.ClientSession = None,
+                 connector_limit: int = 100,
+                 connector_limit_per_host: int = 0,
+                 retry_policy: RetryPolicy = None,
+                 rate_limiter: TokenBucket = None,
+                 cache: ResponseCache = None,
+                 intern: bool = True,
+                 json_loads=None,
+                 token_manager: authorization.TokenManager = None,
+                 metrics: Metrics = None,
+                 coalesce: bool = True):
         """
         :param access_token: The access token, as returned by the OAuth dance
+        :param session: a requests.Session to share between clients;
+                        if omitted, the client creates (and owns) one
+        :param pool_size: max number of kept-alive connections in the pool
+                          (ignored when a session is passed in)
+        :param async_session: an aiohttp.ClientSession to share between
+                              clients; if omitted, the client lazily creates
+                              (and owns) one on the first async request
+        :param connector_limit: max number of simultaneous async connections
+        :param connector_limit_per_host: same, per host (0 means no limit)
+        :param retry_policy: when and how to retry failed requests
+                             (defaults to RetryPolicy())
+        :param rate_limiter: an optional TokenBucket throttling the requests,
+                             which can be shared between clients
+        :param cache: an optional ResponseCache for the GET requests
+        :param intern: share merchants and repeated strings
+                       between the transactions built by the client
+        :param json_loads: the function decoding the response bodies
+                           (defaults to the fastest decoder installed,
+                           i.e. orjson or ujson, then json)
+        :param token_manager: an authorization.TokenManager providing (and
+                              refreshing) the access token, in place of
+                              a fixed access_token
+        :param metrics: an optional Metrics recording a RequestEvent
+                        for every request, which can be shared
+                        between clients
+        :param coalesce: concurrent identical async GETs share a single
+                         request, each caller decoding its own payload
         """
         self._access_token = access_token
+        self._token_manager = token_manager
+        self._owns_session = session is None
+        self._session = session or build_session(pool_size)
+        self._owns_async_session = async_session is None
+        self._async_session = async_session
+        self._async_session_loop = None
+        self._connector_limit = connector_limit
+        self._connector_limit_per_host = connector_limit_per_host
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._rate_limiter = rate_limiter
+        self.cache = cache
+        self.interner = Interner() if intern else None
+        self._json_loads = json_loads or utils.json_loads
+        self.metrics = metrics
+        self._coalesce = coalesce
+        self._in_flight = {}
+
+    @property
+    def session(self) -> requests.Session:
+        return self._session
+
+    @property
+    def async_session(self) -> aiohttp.ClientSession:
+        """
+        The aiohttp session used by the async requests.
+        It must be accessed from within a running event loop; an owned
+        session is rebuilt when used from another loop (i.e. by a second
+        asyncio.run), since it can't outlive the loop it was created on.
+        """
+        if not self._owns_async_session:
+            return self._async_session
+        loop = asyncio.get_running_loop()
+        if (self._async_session is None or self._async_session.closed or
+                self._async_session_loop is not loop):
+            self._async_session_loop = loop
+            self._async_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self._connector_limit,
+                    limit_per_host=self._connector_limit_per_host
+                )
+            )
+        return self._async_session
+
+    def close(self):
+        """
+        Release the pooled connections, if the session is owned by the client
+        """
+        if self._owns_session:
+            self._session.close()
+
+    async def aclose(self):
+        """
+        Release the async connections, if the session is owned by the client
+        """
+        if self._owns_async_session and self._async_session is not None:
+            if self._async_session_loop is asyncio.get_running_loop():
+                await self._async_session.close()
+            self._async_session = None
+            self._async_session_loop = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+        self.close()
+
+    @property
+    def access_token(self) -> str:
+        if self._token_manager is not None:
+            return self._token_manager.access_token
+        return self._access_token
+
+    def _cache_key(self, url: str, parameters: dict = None,
+                   token: str = None) -> CacheKey:
+        token = token or self.access_token
+        return CacheKey(
+            hashlib.sha256(token.encode()).hexdigest()[:16],
+            url, parse.urlencode(sorted((parameters or {}).items()))
+        )
 
     def _make_request(self, url: str, parameters: dict = None,
                       method: str = 'GET', *args, **kwargs):
         """
-        Shortcut for a generic request to the mondo API
+        Shortcut for a generic request to the mondo API,
+        going through the cache (if any) for GETs
 
         :param url: The URL resource part
         :param parameters: Querystring parameters
         :param method: REST method
-        :return: requests.Response
-        """
-        response = requests.request(
-            method=method,
-            url=build_url(
-                self.BASE_API_URL, url, parameters
-            ),
-            headers={
-                'Authorization': 'Bearer {}'.format(self._access_token)
-            }, **kwargs
-        )
-        if response.ok:
-            return response.json()
-        raise MondoApiException(response.json()['message'])
+        :return: the decoded json response
+        """
+        if self.cache is None:
+            return self._send_request(url, parameters, method, **kwargs)
+
+        if method != 'GET':
+            response = self._send_request(url, parameters, method, **kwargs)
+            self.cache.invalidate_after_write(url)
+            return response
+
+        key = self._cache_key(url, parameters)
+        response = self.cache.get(key)
+        if response is None:
+            response = self._send_request(url, parameters, method, **kwargs)
+            self.cache.set(key, response)
+        return response
+
+    def _timer(self, url: str, method: str) -> RequestTimer:
+        return RequestTimer(url, method) if self.metrics is not None else None
+
+    def _record(self, timer: RequestTimer, size: int = 0,
+                error: Exception = None):
+        if timer is not None:
+            self.metrics.record(timer.event(size, error))
+
+    def _send_request(self, url: str, parameters: dict = None,
+                      method: str = 'GET', **kwargs):
+        timer = self._timer(url, method)
+        content = self._open_request(
+            url, parameters, method, timer=timer, **kwargs).content
+        self._record(timer, len(content))
+        return self._json_loads(content)
+
+    def _open_request(self, url: str, parameters: dict = None,
+                      method: str = 'GET', timer: RequestTimer = None,
+                      **kwargs) -> requests.Response:
+        """
+        Send the request, retrying it according to the retry policy
+
+        :param timer: the RequestTimer of the request, recorded here
+                      on failure and by the caller once the body is read
+        :return: the successful requests.Response (pass stream=True to
+                 read the body incrementally)
+        """
+        try:
+            return self._retry_request(url, parameters, method, timer,
+                                       **kwargs)
+        except Exception as error:
+            self._record(timer, error=error)
+            raise
+
+    def _retry_request(self, url: str, parameters: dict, method: str,
+                       timer: RequestTimer, **kwargs) -> requests.Response:
+        attempt = 0
+        reauthenticated = False
+        while True:
+            if self._rate_limiter:
+                self._rate_limiter.acquire()
+            token = self.access_token
+            if timer is not None:
+                timer.retries = attempt + reauthenticated
+                sent = time.perf_counter()
+            try:
+                response = self._session.request(
+                    method=method,
+                    url=build_url(
+                        self.BASE_API_URL, url, parameters
+                    ),
+                    headers={
+                        'Authorization': 'Bearer {}'.format(token)
+                    }, **kwargs
+                )
+            except requests.ConnectionError:
+                if not self._retry_policy.should_retry(method, None, attempt):
+                    raise
+                time.sleep(self._retry_policy.delay(attempt))
+                attempt += 1
+                continue
+
+            if timer is not None:
+                timer.response(response.status_code, sent - timer.started +
+                               response.elapsed.total_seconds())
+            if response.ok:
+                return response
+            if (response.status_code == 401 and not reauthenticated and
+                    self._token_manager is not None):
+                # the token expired early: refresh it and try once more
+                self._token_manager.refresh(stale_token=token)
+                reauthenticated = True
+                continue
+            if not self._retry_policy.should_retry(
+                    method, response.status_code, attempt):
+                raise MondoApiException(
+                    _error_message(response.text, response.reason),
+                    status_code=response.status_code)
+            time.sleep(self._retry_policy.delay(
+                attempt, parse_retry_after(response.headers.get('Retry-After'))
+            ))
+            attempt += 1
 
     async def _make_async_request(self, url, parameters, method='GET',
                                   *args, **kwargs):
+        """
+        Async twin of _make_request, sharing the client's aiohttp session.
+        Concurrent identical GETs are coalesced into a single request.
 
-        loop = asyncio.get_event_loop()
-        with aiohttp.ClientSession(loop=loop) as session:
-            response = await session.request(
-                method=method,
-                url=build_url(
-                    self.BASE_API_URL, url, parameters
-                ),
-                headers={
-                    'Authorization': 'Bearer {}'.format(self._access_token)
-                })
-            response = await response.json()
+        :param url: The URL resource part
+        :param parameters: Querystring parameters
+        :param method: REST method
+        :return: the decoded json response
+        """
+        if method != 'GET':
+            response = await self._send_async_request(
+                url, parameters, method, **kwargs)
+            if self.cache is not None:
+                self.cache.invalidate_after_write(url)
+            return response
+
+        if self.cache is None and not self._coalesce:
+            return await self._send_async_request(
+                url, parameters, method, **kwargs)
+
+        key = self._cache_key(
+            url, parameters, await self._access_token_async())
+        if self.cache is not None:
+            response = self.cache.get(key)
+            if response is not None:
+                return response
+
+        if self._coalesce and not kwargs:
+            response = await self._single_flight(key, url, parameters)
+        else:
+            response = await self._send_async_request(
+                url, parameters, method, **kwargs)
+        if self.cache is not None:
+            self.cache.set(key, response)
         return response
 
+    async def _single_flight(self, key: CacheKey, url: str,
+                             parameters: dict):
+        """
+        GET the resource, or wait for the identical GET already in flight.
+        The callers share the response body, and each decodes its own
+        payload from it.
+        """
+        # futures belong to a loop: the same client may be used by many
+        key = (asyncio.get_running_loop(), key)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._read_async_request(url, parameters, 'GET'))
+            self._in_flight[key] = task
+
+            def landed(task):
+                del self._in_flight[key]
+                if not task.cancelled():
+                    # retrieved, even if every caller was cancelled
+                    task.exception()
+            task.add_done_callback(landed)
+        # a cancelled caller doesn't cancel the request of the others
+        return self._json_loads(await asyncio.shield(task))
+
+    async def _send_async_request(self, url, parameters, method='GET',
+                                  **kwargs):
+        return self._json_loads(await self._read_async_request(
+            url, parameters, method, **kwargs))
+
+    async def _read_async_request(self, url, parameters, method='GET',
+                                  **kwargs) -> bytes:
+        """
+        :return: the body of the successful response
+        """
+        timer = self._timer(url, method)
+        response = await self._open_async_request(
+            url, parameters, method, timer=timer, **kwargs)
+        try:
+            content = await response.read()
+        except Exception as error:
+            self._record(timer, error=error)
+            raise
+        finally:
+            response.release()
+        self._record(timer, len(content))
+        return content
+
+    async def _open_async_request(self, url, parameters, method='GET',
+                                  timer: RequestTimer = None,
+                                  **kwargs) -> aiohttp.ClientResponse:
+        """
+        Async twin of _open_request
+
+        :return: the successful aiohttp.ClientResponse, to be released
+                 by the caller once the body is read
+        """
+        try:
+            return await self._retry_async_request(
+                url, parameters, method, timer, **kwargs)
+        except Exception as error:
+            self._record(timer, error=error)
+            raise
+
+    async def _retry_async_request(self, url, parameters, method,
+                                   timer: RequestTimer,
+                                   **kwargs) -> aiohttp.ClientResponse:
+        attempt = 0
+        reauthenticated = False
+        while True:
+            if self._rate_limiter:
+                await self._rate_limiter.acquire_async()
+            token = await self._access_token_async()
+            if timer is not None:
+                timer.retries = attempt + reauthenticated
+            try:
+                response = await self.async_session.request(
+                    method=method,
+                    url=build_url(
+                        self.BASE_API_URL, url, parameters
+                    ),
+                    headers={
+                        'Authorization': 'Bearer {}'.format(token)
+                    }, **kwargs)
+            except aiohttp.ClientConnectionError:
+                if not self._retry_policy.should_retry(method, None, attempt):
+                    raise
+                await asyncio.sleep(self._retry_policy.delay(attempt))
+                attempt += 1
+                continue
+
+            if timer is not None:
+                timer.response(response.status)
+            if response.status < 400:
+                return response
+            try:
+                text = await response.text()
+            finally:
+                response.release()
+            if (response.status == 401 and not reauthenticated and
+                    self._token_manager is not None):
+                await self._token_manager.refresh_async(stale_token=token)
+                reauthenticated = True
+                continue
+            if not self._retry_policy.should_retry(
+                    method, response.status, attempt):
+                raise MondoApiException(
+                    _error_message(text, response.reason),
+                    status_code=response.status)
+            await asyncio.sleep(self._retry_policy.delay(
+                attempt, parse_retry_after(response.headers.get('Retry-After'))
+            ))
+            attempt += 1
+
+    def _stream_request(self, url: str, parameters: dict, key: str,
+                        chunk_size: int = 1 << 16) -> Iterator[dict]:
+        """
+        GET a resource and yield the elements of its `key` array
+        while the body is still being received
+
+        :param url: The URL resource part
+        :param parameters: Querystring parameters
+        :param key: the key of the array in the response
+        :param chunk_size: size of the chunks read from the socket
+        :return: an iterator of the decoded elements
+        """
+        timer = self._timer(url, 'GET')
+        response = self._open_request(
+            url, parameters, timer=timer, stream=True)
+        stream = JSONArrayStream(key)
+        size = 0
+        error = None
+        try:
+            for chunk in response.iter_content(chunk_size):
+                size += len(chunk)
+                yield from stream.feed(chunk)
+            yield from stream.close()
+        except Exception as exception:
+            error = exception
+            raise
+        finally:
+            response.close()
+            self._record(timer, size, error)
+
+    async def _stream_async_request(
+            self, url: str, parameters: dict, key: str,
+            chunk_size: int = 1 << 16) -> AsyncIterator[dict]:
+        """
+        Async twin of _stream_request
+        """
+        timer = self._timer(url, 'GET')
+        response = await self._open_async_request(
+            url, parameters, timer=timer)
+        stream = JSONArrayStream(key)
+        size = 0
+        error = None
+        try:
+            async for chunk in response.content.iter_chunked(chunk_size):
+                size += len(chunk)
+                for item in stream.feed(chunk):
+                    yield item
+            for item in stream.close():
+                yield item
+        except Exception as exception:
+            error = exception
+            raise
+        finally:
+            response.release()
+            self._record(timer, size, error)
+
+    async def _access_token_async(self) -> str:
+        manager = self._token_manager
+        if manager is None:
+            return self._access_token
+        access = manager.access
+        if manager.expiring:
+            access = await manager.refresh_async(
+                stale_token=access.access_token)
+        return access.access_token
+
     def refresh_token(self, client_id, client_secret, refresh_token):
-        self._access_token, _ = authorization.refresh_access_token(
-            client_id, client_secret, refresh_token
+        """
+        Replace the access token with a refreshed one
+
+        :return: the MondoAccess with the new tokens
+        """
+        access = authorization.refresh_access_token(
+            client_id, client_secret, refresh_token, session=self._session
         )
+        self._access_token = access.access_token
+        return access
 
 
 class Account(object):
+    __slots__ = ('id', 'description', '_created', '__client')
+
     def __init__(self, id, description, created, client=None, *args, **kwargs):
         self.id = id
         self.description = description
-        self.created = dateutil.parser.parse(created)
+        self._created = created  # parsed on first access
         self.__client = client
 
+    @property
+    def created(self):
+        if isinstance(self._created, str):
+            self._created = parse_datetime(self._created)
+        return self._created
+
     @property
     def transactions(self):
+        store = getattr(self.__client, 'store', None)
+        # served from disk only once the account has been synced
+        if store is not None and store.cursor(self.id) is not None:
+            return store.list_transactions(account_id=self.id)
         return self.list_transactions()
 
     def __repr__(self):
@@ -85,53 +552,205 @@ class Account(object):
 
     def get_balance(self):
         if self.__client:
-            return self.__client.get_balance(account_id=self.id)
+            return blocking_method(self.__client, 'get_balance')(
+                account_id=self.id)
+
+    async def get_balance_async(self):
+        if self.__client:
+            return await self.__client.get_balance_async(account_id=self.id)
 
     def list_transactions(self, since: datetime.datetime = None,
                           before: datetime.datetime = None,
                           limit: int = None):
         if self.__client:
-            return self.__client.list_transactions(
+            return blocking_method(self.__client, 'list_transactions')(
+                account_id=self.id, since=since, before=before, limit=limit)
+
+    async def list_transactions_async(self, since: datetime.datetime = None,
+                                      before: datetime.datetime = None,
+                                      limit: int = None):
+        if self.__client:
+            return await self.__client.list_transactions_async(
                 account_id=self.id, since=since, before=before, limit=limit)
 
+    def iter_transactions(self, since: datetime.datetime = None,
+                          before: datetime.datetime = None,
+                          page_size: int = 100):
+        if self.__client:
+            return blocking_method(self.__client, 'iter_transactions')(
+                account_id=self.id, since=since, before=before,
+                page_size=page_size)
+
+    def iter_transactions_async(self, since: datetime.datetime = None,
+                                before: datetime.datetime = None,
+                                page_size: int = 100):
+        """
+        :return: an async iterator of Transaction objects
+        """
+        if self.__client:
+            return self.__client.iter_transactions_async(
+                account_id=self.id, since=since, before=before,
+                page_size=page_size)
+
     def list_webhooks(self):
         if self.__client:
-            return self.__client.list_webhooks(account_id=self.id)
+            return blocking_method(self.__client, 'list_webhooks')(
+                account_id=self.id)
+
+    async def list_webhooks_async(self):
+        if self.__client:
+            return await self.__client.list_webhooks_async(account_id=self.id)
 
     def register_webhook(self, url: str):
         if self.__client:
-            return self.__client.register_webhook(account_id=self.id, url=url)
+            return blocking_method(self.__client, 'register_webhook')(
+                account_id=self.id, url=url)
+
+    async def register_webhook_async(self, url: str):
+        if self.__client:
+            return await self.__client.register_webhook_async(
+                account_id=self.id, url=url)
 
 
 class Balance(object):
+    __slots__ = ('_amount', '_spent_today', 'currency', 'generated_at')
+
     def __init__(self, balance, spend_today, currency, generated_at, *args,
                  **kwargs):
-        self.amount = Amount(D(balance) / 100, currency)  # it's in pence
-        self.spent_today = Amount(D(spend_today) / 100, currency)
+        # both are in pence, and converted on first access
+        self._amount = balance
+        self._spent_today = spend_today
         self.currency = currency
         self.generated_at = generated_at
 
+    @property
+    def amount(self):
+        if not isinstance(self._amount, Amount):
+            self._amount = Amount.from_minor(self._amount, self.currency)
+        return self._amount
+
+    @property
+    def spent_today(self):
+        if not isinstance(self._spent_today, Amount):
+            self._spent_today = Amount.from_minor(
+                self._spent_today, self.currency)
+        return self._spent_today
+
     def __repr__(self):
         return "{} (at {})".format(
             self.amount, self.generated_at)
 
 
+@total_ordering
 class Amount(object):
+    """
+    A sum of money, stored as an integer number of minor units (pence)
+    so that arithmetic stays exact and cheap.
+    The Decimal value is only built for display.
+    """
+    __slots__ = ('_minor', '_currency')
+    MINOR_UNITS = 100
+
     def __init__(self, value, currency, *args, **kwargs):
-        self._value = D(value)
+        """
+        :param value: the amount in major units (i.e. '5.50')
+        :param currency: the currency code
+        """
+        self._minor = int((D(value) * self.MINOR_UNITS).to_integral_value())
         self._currency = currency
 
+    @classmethod
+    def from_minor(cls, minor: int, currency: str) -> 'Amount':
+        """
+        :param minor: the amount in minor units, as returned by the API
+        :param currency: the currency code
+        :return: an Amount
+        """
+        amount = cls.__new__(cls)
+        amount._minor = minor
+        amount._currency = currency
+        return amount
+
+    @classmethod
+    def total(cls, amounts, currency: str = None) -> 'Amount':
+        """
+        Sum many amounts at once, without allocating the partial sums
+
+        :param amounts: an iterable of Amount
+        :param currency: the currency of the result, required if
+                         amounts may be empty
+        :return: an Amount
+        """
+        total = 0
+        for amount in amounts:
+            if currency is None:
+                currency = amount._currency
+            elif amount._currency != currency:
+                raise ValueError('Different currencies: {} and {}'.format(
+                    currency, amount._currency))
+            total += amount._minor
+        return cls.from_minor(total, currency)
+
+    def _minor_of(self, other) -> int:
+        if other._currency != self._currency:
+            raise ValueError('Different currencies: {} and {}'.format(
+                self._currency, other._currency))
+        return other._minor
+
     def __add__(self, other):
-        assert self.currency == other.currency, Exception(
-            'Different currencies')
-        return Amount(self.value + other.value, self.currency)
+        if not isinstance(other, Amount):
+            return NotImplemented
+        return Amount.from_minor(
+            self._minor + self._minor_of(other), self._currency)
+
+    def __radd__(self, other):
+        # so that sum() works, starting from 0
+        if other == 0:
+            return self
+        return NotImplemented
+
+    def __sub__(self, other):
+        if not isinstance(other, Amount):
+            return NotImplemented
+        return Amount.from_minor(
+            self._minor - self._minor_of(other), self._currency)
+
+    def __mul__(self, other):
+        if not isinstance(other, int):
+            return NotImplemented
+        return Amount.from_minor(self._minor * other, self._currency)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Amount.from_minor(-self._minor, self._currency)
+
+    def __abs__(self):
+        return Amount.from_minor(abs(self._minor), self._currency)
+
+    def __bool__(self):
+        return self._minor != 0
 
     def __eq__(self, other):
-        return self.value == other.value and self.currency == other.currency
+        if not isinstance(other, Amount):
+            return NotImplemented
+        return self._minor == other._minor and self._currency == other._currency
+
+    def __lt__(self, other):
+        if not isinstance(other, Amount):
+            return NotImplemented
+        return self._minor < self._minor_of(other)
+
+    def __hash__(self):
+        return hash((self._minor, self._currency))
+
+    @property
+    def minor(self) -> int:
+        return self._minor
 
     @property
-    def value(self):
-        return self._value
+    def value(self) -> D:
+        return D(self._minor) / self.MINOR_UNITS
 
     @property
     def currency(self):
@@ -144,6 +763,13 @@ class Amount(object):
 
 
 class Transaction(object):
+    __slots__ = (
+        'id', 'description', 'currency', 'metadata', 'is_load', 'settled',
+        'category', 'decline_reason', '_amount', '_account_balance',
+        '_local_amount', '_local_currency', '_created', '_attachments',
+        '_merchant', '__client'
+    )
+
     def __init__(self, id, description, amount, currency, created,
                  account_balance, metadata, is_load, settled,
                  local_amount, local_currency, category, attachments,
@@ -152,40 +778,79 @@ class Transaction(object):
         self.__client = client
         self.id = id
         self.description = description
-        self._amount = Amount(D(amount) / 100, currency)
         self.currency = currency
-        self.created = dateutil.parser.parse(created)
-
-        self.attachments = [
-            Attachment(**attachment, client=client)
-            for attachment in attachments
-            ] if attachments else None
-
-        self.merchant = Merchant(**merchant) if isinstance(merchant, dict) else None
-
-        # mondo is UK only for the moment,
-        # so you can only have a GBP account currency
-        self._account_balance = Amount(D(account_balance) / 100, 'GBP')
-        self._local_amount = Amount(D(local_amount / 100), local_currency)
         self.metadata = metadata
         self.is_load = is_load
         self.settled = settled
         self.category = category
         self.decline_reason = decline_reason
-        self.emoji = getattr(self.merchant, 'emoji', None)
+
+        # The raw values are kept as returned by the API,
+        # and only converted the first time they are accessed
+        self._amount = amount
+        self._account_balance = account_balance
+        self._local_amount = local_amount
+        self._local_currency = local_currency
+        self._created = created
+        self._attachments = attachments
+        self._merchant = merchant
+
+        interner = getattr(client, 'interner', None)
+        if interner is not None:
+            # share the repeated values with the other transactions
+            self.currency = interner.string(currency)
+            self.category = interner.string(category)
+            self._local_currency = interner.string(local_currency)
+            if isinstance(merchant, dict):
+                self._merchant = interner.merchant(merchant)
 
     @property
     def amount(self):
+        if not isinstance(self._amount, Amount):
+            self._amount = Amount.from_minor(self._amount, self.currency)
         return self._amount
 
     @property
     def account_balance(self):
+        if not isinstance(self._account_balance, Amount):
+            # mondo is UK only for the moment,
+            # so you can only have a GBP account currency
+            self._account_balance = Amount.from_minor(
+                self._account_balance, 'GBP')
         return self._account_balance
 
     @property
     def local_amount(self):
+        if not isinstance(self._local_amount, Amount):
+            self._local_amount = Amount.from_minor(
+                self._local_amount, self._local_currency)
         return self._local_amount
 
+    @property
+    def created(self):
+        if isinstance(self._created, str):
+            self._created = parse_datetime(self._created)
+        return self._created
+
+    @property
+    def attachments(self):
+        if self._attachments and isinstance(self._attachments[0], dict):
+            self._attachments = [
+                Attachment(**attachment, client=self.__client)
+                for attachment in self._attachments
+            ]
+        return self._attachments or None
+
+    @property
+    def merchant(self):
+        if isinstance(self._merchant, dict):
+            self._merchant = Merchant(**self._merchant)
+        return self._merchant if isinstance(self._merchant, Merchant) else None
+
+    @property
+    def emoji(self):
+        return getattr(self.merchant, 'emoji', None)
+
     @property
     def notes(self):
         return self.metadata.get('notes')
@@ -196,11 +861,23 @@ class Transaction(object):
 
     def add_metadata(self, metadata: dict):
         if self.__client:
-            return self.__client.annotate_transaction(self.id, metadata)
+            return blocking_method(self.__client, 'annotate_transaction')(
+                self.id, metadata)
+
+    async def add_metadata_async(self, metadata: dict):
+        if self.__client:
+            return await self.__client.annotate_transaction_async(
+                self.id, metadata)
 
     def register_attachment(self, file_url: str, file_type: str):
         if self.__client:
-            return self.__client.register_attachment(
+            return blocking_method(self.__client, 'register_attachment')(
+                self.id, file_url, file_type
+            )
+
+    async def register_attachment_async(self, file_url: str, file_type: str):
+        if self.__client:
+            return await self.__client.register_attachment_async(
                 self.id, file_url, file_type
             )
 
@@ -211,6 +888,9 @@ class Transaction(object):
 
 
 class Merchant(object):
+    __slots__ = ('id', 'group_id', 'name', 'address', 'category', 'logo',
+                 'emoji', 'created', 'metadata', '__weakref__')
+
     def __init__(self, id, group_id, name, address, category, logo, emoji,
                  created, metadata, *args, **kwargs):
         self.id = id
@@ -229,7 +909,41 @@ class Merchant(object):
         )
 
 
+class Interner(object):
+    """
+    Deduplicates the values repeated across transactions:
+    the transactions with the same merchant id share one Merchant,
+    and categories and currencies share one string.
+    Merchants are only held as long as some transaction uses them.
+    """
+
+    def __init__(self):
+        self._merchants = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def merchant(self, payload: dict) -> 'Merchant':
+        """
+        :param payload: an expanded merchant, as returned by the API
+        :return: the shared Merchant for that id
+        """
+        with self._lock:
+            merchant = self._merchants.get(payload['id'])
+            if merchant is None:
+                merchant = self._merchants[payload['id']] = Merchant(**payload)
+        return merchant
+
+    @staticmethod
+    def string(value):
+        return sys.intern(value) if isinstance(value, str) else value
+
+    def __len__(self):
+        return len(self._merchants)
+
+
 class Attachment(object):
+    __slots__ = ('id', 'user_id', 'external_id', 'file_url', 'file_type',
+                 '_created', '__client')
+
     def __init__(self, id, user_id, external_id, file_url, file_type, created,
                  client=None, *args, **kwargs):
         self.id = id
@@ -237,9 +951,15 @@ class Attachment(object):
         self.external_id = external_id
         self.file_url = file_url
         self.file_type = file_type
-        self.created = dateutil.parser.parse(created)
+        self._created = created  # parsed on first access
         self.__client = client
 
+    @property
+    def created(self):
+        if isinstance(self._created, str):
+            self._created = parse_datetime(self._created)
+        return self._created
+
     def __repr__(self):
         return "<Attachment: {} {} ({}) / {}>".format(
             self.id, self.file_url, self.file_type, self.created
@@ -247,7 +967,11 @@ class Attachment(object):
 
     def deregister(self):
         if self.__client:
-            self.__client.deregister_attachment(self.id)
+            blocking_method(self.__client, 'deregister_attachment')(self.id)
+
+    async def deregister_async(self):
+        if self.__client:
+            await self.__client.deregister_attachment_async(self.id)
 
 
 class Webhook(object):
@@ -261,7 +985,13 @@ class Webhook(object):
 
     def delete(self):
         if self.client:
-            self.client.delete_webhook(self.id)
+            blocking_method(self.client, 'delete_webhook')(self.id)
+            self.active = False
+            self.url = None
+
+    async def delete_async(self):
+        if self.client:
+            await self.client.delete_webhook_async(self.id)
             self.active = False
             self.url = None
 
@@ -0,0 +1,238 @@
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Tuple
+import asyncio
+
+import aiohttp
+
+from mondo.authorization import TokenManager
+from mondo.client import MondoClient
+from mondo.retry import TokenBucket
+from mondo.utils import build_session
+
+PoolResult = namedtuple('PoolResult', ['tenant_id', 'result', 'error'])
+
+
+class ClientPool(object):
+    """
+    Many MondoClients, one per user token, sharing one connection pool,
+    one concurrency limit and one rate limiter.
+
+    Fan-out operations run on at most `concurrency` workers, shared by
+    all the concurrent calls (the async ones share their own limit, on
+    each event loop), and the jobs are scheduled round-robin across tenants
+    so that a tenant with many jobs doesn't delay the others.
+    """
+
+    def __init__(self, concurrency: int = 16, rate_limiter: TokenBucket = None,
+                 connector_limit: int = 100, **client_kwargs):
+        """
+        :param concurrency: max number of concurrent jobs
+        :param rate_limiter: a TokenBucket shared by all the tenants
+        :param connector_limit: max number of simultaneous async connections
+        :param client_kwargs: passed to every MondoClient
+        """
+        self.concurrency = concurrency
+        self._rate_limiter = rate_limiter
+        self._connector_limit = connector_limit
+        self._client_kwargs = client_kwargs
+        self._session = build_session(concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._async_session = None
+        self._async_session_loop = None
+        self._async_semaphore = None
+        self._clients = OrderedDict()
+
+    def add(self, tenant_id, access_token: str = None,
+            token_manager: TokenManager = None,
+            store_path: str = None) -> MondoClient:
+        """
+        :param tenant_id: any hashable identifying the user
+        :param access_token: the user's access token
+        :param token_manager: or a TokenManager for the user
+        :param store_path: open a transaction store for the user in that
+                           SQLite file (see MondoClient.open_store)
+        :return: the tenant's MondoClient
+        """
+        client = MondoClient(
+            access_token, session=self._session,
+            async_session=self._async_session,
+            rate_limiter=self._rate_limiter, token_manager=token_manager,
+            **self._client_kwargs)
+        if store_path is not None:
+            client.open_store(store_path)
+        self._clients[tenant_id] = client
+        return client
+
+    def remove(self, tenant_id):
+        del self._clients[tenant_id]
+
+    def __getitem__(self, tenant_id) -> MondoClient:
+        return self._clients[tenant_id]
+
+    def __contains__(self, tenant_id) -> bool:
+        return tenant_id in self._clients
+
+    def __len__(self):
+        return len(self._clients)
+
+    @property
+    def tenants(self) -> List:
+        return list(self._clients)
+
+    def run(self, jobs: Iterable[Tuple]) -> List[PoolResult]:
+        """
+        Run (tenant_id, function) jobs, each function being called with
+        the tenant's client
+
+        :param jobs: an iterable of (tenant_id, function) tuples
+        :return: a list of PoolResult, in the same order as the jobs
+        """
+        queues = OrderedDict()
+        count = 0
+        for index, (tenant_id, job) in enumerate(jobs):
+            queues.setdefault(tenant_id, deque()).append((index, job))
+            count = index + 1
+
+        def execute(tenant_id, job):
+            try:
+                return PoolResult(tenant_id, job(self._clients[tenant_id]), None)
+            except Exception as error:
+                return PoolResult(tenant_id, None, error)
+
+        results = [None] * count
+        futures = [
+            (index, self._executor.submit(execute, tenant_id, job))
+            for tenant_id, index, job in _round_robin(queues)
+        ]
+        for index, future in futures:
+            results[index] = future.result()
+        return results
+
+    def fan_out(self, function: Callable, tenants: Iterable = None) -> Dict:
+        """
+        Call function(client) for every tenant
+
+        :param function: called with each tenant's MondoClient
+        :param tenants: only these tenants (defaults to all)
+        :return: a dict of tenant_id -> PoolResult
+        """
+        tenants = self.tenants if tenants is None else list(tenants)
+        return {
+            result.tenant_id: result
+            for result in self.run((tenant, function) for tenant in tenants)
+        }
+
+    async def fan_out_async(self, function: Callable,
+                            tenants: Iterable = None) -> Dict:
+        """
+        Await function(client) for every tenant, sharing one aiohttp session
+
+        :param function: a coroutine function called with each client
+        :param tenants: only these tenants (defaults to all)
+        :return: a dict of tenant_id -> PoolResult
+        """
+        semaphore = self._share_async_session()
+        tenants = self.tenants if tenants is None else list(tenants)
+
+        async def execute(tenant_id):
+            async with semaphore:
+                try:
+                    return PoolResult(
+                        tenant_id, await function(self._clients[tenant_id]),
+                        None)
+                except Exception as error:
+                    return PoolResult(tenant_id, None, error)
+
+        results = await asyncio.gather(*[execute(t) for t in tenants])
+        return {result.tenant_id: result for result in results}
+
+    def balances(self, tenants: Iterable = None) -> Dict:
+        """
+        :return: a dict of tenant_id -> PoolResult holding the Balance
+                 of the tenant's default account
+        """
+        return self.fan_out(
+            lambda client: client.default_account.get_balance(), tenants)
+
+    async def balances_async(self, tenants: Iterable = None) -> Dict:
+        """
+        Async twin of balances
+        """
+        async def balance(client):
+            account = await client.default_account_async()
+            return await account.get_balance_async()
+        return await self.fan_out_async(balance, tenants)
+
+    def sync_all(self, tenants: Iterable = None) -> Dict:
+        """
+        Sync the store of every account (see the store_path of add)
+
+        :return: a dict of tenant_id -> PoolResult holding the number
+                 of synced transactions; a ValueError for the tenants
+                 without a store
+        """
+        def sync(client):
+            if client.store is None:
+                raise ValueError(
+                    'No transaction store: add the tenant with a store_path')
+            return sum(client.store.sync(account.id)
+                       for account in client.list_accounts())
+        return self.fan_out(sync, tenants)
+
+    def _share_async_session(self) -> asyncio.Semaphore:
+        """
+        Hand the pool's aiohttp session to every client, rebuilding it
+        (and the concurrency limit) when used from another event loop
+
+        :return: the concurrency limit of the running loop
+        """
+        loop = asyncio.get_running_loop()
+        if (self._async_session is None or self._async_session.closed or
+                self._async_session_loop is not loop):
+            self._async_session_loop = loop
+            self._async_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._connector_limit))
+            self._async_semaphore = asyncio.Semaphore(self.concurrency)
+        for client in self._clients.values():
+            client._async_session = self._async_session
+            client._owns_async_session = False
+        return self._async_semaphore
+
+    def close(self):
+        self._executor.shutdown()
+        self._session.close()
+
+    async def aclose(self):
+        if self._async_session is not None:
+            if self._async_session_loop is asyncio.get_running_loop():
+                await self._async_session.close()
+            self._async_session = None
+            self._async_session_loop = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+        self.close()
+
+
+def _round_robin(queues: OrderedDict):
+    """
+    :param queues: tenant_id -> deque of (index, job)
+    :return: an iterator of (tenant_id, index, job), one tenant at a time
+    """
+    while queues:
+        for tenant_id in list(queues):
+            queue = queues[tenant_id]
+            index, job = queue.popleft()
+            if not queue:
+                del queues[tenant_id]
+            yield tenant_id, index, job
@@ -0,0 +1,122 @@
+from email.utils import parsedate_to_datetime
+import asyncio
+import datetime
+import random
+import threading
+import time
+
+
+def parse_retry_after(value: str) -> float:
+    """
+    :param value: a Retry-After header, either in seconds or as a HTTP date
+    :return: the number of seconds to wait, or None
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max((date - now).total_seconds(), 0)
+
+
+class RetryPolicy(object):
+    """
+    Decide whether a failed request should be retried, and after how long.
+
+    Only idempotent methods are retried, on connection errors and on
+    the statuses in `retry_statuses`; the delay is an exponential backoff
+    with full jitter, unless the server sent a Retry-After header.
+    """
+    IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+    RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+    def __init__(self, max_retries: int = 3, backoff_factor: float = 0.5,
+                 max_backoff: float = 30.0, retry_statuses=None, methods=None):
+        """
+        :param max_retries: max number of retries per request
+        :param backoff_factor: base delay, in seconds
+        :param max_backoff: max delay between two attempts, in seconds
+                            (Retry-After included)
+        :param retry_statuses: the HTTP statuses worth retrying
+        :param methods: the HTTP methods that can be safely retried
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = frozenset(retry_statuses or self.RETRY_STATUSES)
+        self.methods = frozenset(methods or self.IDEMPOTENT_METHODS)
+
+    def should_retry(self, method: str, status: int, attempt: int) -> bool:
+        """
+        :param method: the HTTP method
+        :param status: the response status, None on a connection error
+        :param attempt: the number of retries already made
+        :return: True if the request should be sent again
+        """
+        if attempt >= self.max_retries or method.upper() not in self.methods:
+            return False
+        return status is None or status in self.retry_statuses
+
+    def delay(self, attempt: int, retry_after: float = None) -> float:
+        """
+        :param attempt: the number of retries already made
+        :param retry_after: the delay asked by the server, if any
+        :return: the number of seconds to wait before retrying,
+                 never more than max_backoff
+        """
+        if retry_after is not None:
+            # a far Retry-After mustn't block the worker for that long
+            return min(retry_after, self.max_backoff)
+        return random.uniform(
+            0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+
+class TokenBucket(object):
+    """
+    Client-side rate limiter: `rate` requests per second on average,
+    with bursts up to `capacity`. Thread safe, and usable from asyncio.
+    """
+
+    def __init__(self, rate: float, capacity: int = None):
+        """
+        :param rate: the number of tokens added per second
+        :param capacity: the max number of tokens (defaults to rate)
+        """
+        self.rate = rate
+        self.capacity = capacity or max(int(rate), 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Take a token, possibly borrowing it from the future
+
+        :return: the number of seconds to wait before using it
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
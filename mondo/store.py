@@ -0,0 +1,161 @@
+import datetime
+import json
+import sqlite3
+import threading
+from typing import List
+
+from mondo.mondo import Transaction
+from mondo.utils import epoch_microseconds
+
+# created_at, the epoch microseconds of created, sorts and compares
+# correctly whatever the precision of the timestamp strings
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id TEXT PRIMARY KEY,
+    account_id TEXT NOT NULL,
+    created TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transactions_account_created_at
+    ON transactions (account_id, created_at);
+CREATE TABLE IF NOT EXISTS sync_state (
+    account_id TEXT PRIMARY KEY,
+    cursor TEXT NOT NULL
+);
+"""
+
+
+class TransactionStore(object):
+    """
+    A local SQLite copy of the transaction feed.
+
+    `sync` only fetches the transactions newer than the last one stored,
+    the reads are then served from disk.
+    """
+
+    def __init__(self, client, path: str = ':memory:'):
+        """
+        :param client: the MondoClient used to sync
+        :param path: the SQLite database file
+        """
+        self._client = client
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def cursor(self, account_id: str) -> str:
+        """
+        :param account_id: account id
+        :return: the id of the last synced transaction, if any
+        """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT cursor FROM sync_state WHERE account_id = ?',
+                (account_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def sync(self, account_id: str, since=None, page_size: int = 100) -> int:
+        """
+        Fetch the transactions newer than the stored cursor and upsert them.
+        Each page is committed as it arrives, so an interrupted sync
+        resumes where it stopped.
+
+        :param account_id: account id
+        :param since: re-sync from that date or transaction id instead of
+                      the stored cursor (i.e. to pick up settlements)
+        :param page_size: number of transactions to fetch per request
+        :return: the number of upserted transactions
+        """
+        count = 0
+        for page in self._client._iter_transaction_pages(
+                account_id, since=since or self.cursor(account_id),
+                page_size=page_size):
+            self.upsert(account_id, page)
+            count += len(page)
+        return count
+
+    def upsert(self, account_id: str, transactions: List[dict]):
+        """
+        Store raw transaction payloads and move the cursor to the last one
+
+        :param account_id: account id
+        :param transactions: transaction payloads, oldest first
+        """
+        if not transactions:
+            return
+        with self._lock, self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO transactions '
+                '(id, account_id, created, created_at, payload) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(transaction['id'], account_id, transaction['created'],
+                  epoch_microseconds(transaction['created']),
+                  json.dumps(transaction))
+                 for transaction in transactions]
+            )
+            self._connection.execute(
+                'INSERT OR REPLACE INTO sync_state (account_id, cursor) '
+                'VALUES (?, ?)', (account_id, transactions[-1]['id'])
+            )
+
+    def list_transactions(self, account_id: str,
+                          since: datetime.datetime = None,
+                          before: datetime.datetime = None,
+                          limit: int = None) -> List[Transaction]:
+        """
+        List the stored transactions for the account, oldest first
+
+        :param account_id: account id
+        :param since: only list transactions after that date
+        :param before: only list transactions before that date
+        :param limit: only show a number of transactions
+        :return: A list of Transaction objects
+        """
+        query = 'SELECT payload FROM transactions WHERE account_id = ?'
+        params = [account_id]
+        if since:
+            query += ' AND created_at > ?'
+            params.append(epoch_microseconds(since))
+        if before:
+            query += ' AND created_at < ?'
+            params.append(epoch_microseconds(before))
+        query += ' ORDER BY created_at'
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+
+        return [
+            Transaction(client=self._client, **json.loads(payload))
+            for payload, in rows
+        ]
+
+    def get_transaction(self, transaction_id: str,
+                        raw: bool = False) -> Transaction:
+        """
+        :param transaction_id: Transaction.id
+        :param raw: return the stored payload instead of a Transaction
+        :return: the stored Transaction, or None
+        """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT payload FROM transactions WHERE id = ?',
+                (transaction_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        payload = json.loads(row[0])
+        return payload if raw else Transaction(client=self._client, **payload)
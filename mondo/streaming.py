@@ -0,0 +1,145 @@
+import codecs
+import json
+from typing import List
+
+WHITESPACE = ' \t\n\r'
+
+
+class JSONArrayStream(object):
+    """
+    Incremental parser for a JSON object holding a (large) array under `key`,
+    like the /transactions response.
+
+    Feed it the raw chunks as they come from the socket: it returns
+    each element of the array as soon as it has been fully received,
+    and only keeps the unparsed tail of the body in memory.
+    """
+    # a buffer bigger than this is trimmed of the already parsed prefix
+    TRIM_SIZE = 1 << 16
+
+    def __init__(self, key: str):
+        """
+        :param key: the key of the array to stream
+        """
+        self.key = key
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._state = 'start'
+        self._current_key = None
+        self._eof = False
+
+    def feed(self, chunk: bytes) -> List[dict]:
+        """
+        :param chunk: the next chunk of the body
+        :return: the array elements completed by this chunk
+        """
+        self._buffer += self._decoder.decode(chunk)
+        items = self._parse()
+        if self._pos > self.TRIM_SIZE:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        return items
+
+    def close(self) -> List[dict]:
+        """
+        Signal the end of the body
+
+        :return: the last array elements, if any
+        """
+        self._buffer += self._decoder.decode(b'', final=True)
+        self._eof = True
+        items = self._parse()
+        if self._state != 'done':
+            raise ValueError('Truncated JSON body')
+        return items
+
+    def _skip_whitespace(self) -> str:
+        """
+        :return: the next significant character, or '' if more data is needed
+        """
+        buffer = self._buffer
+        pos = self._pos
+        while pos < len(buffer) and buffer[pos] in WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return buffer[pos] if pos < len(buffer) else ''
+
+    def _expect(self, char: str, expected: str):
+        if char not in expected:
+            raise ValueError('Unexpected {!r} at position {}'.format(
+                char, self._pos))
+
+    def _decode_value(self):
+        """
+        :return: a (complete, value) tuple; complete is False
+                 if the value might continue in the next chunk
+        """
+        try:
+            value, end = self._json.raw_decode(self._buffer, self._pos)
+        except ValueError:
+            if self._eof:
+                raise
+            return False, None
+        # a number at the very end of the buffer might not be complete
+        if end == len(self._buffer) and not self._eof and isinstance(
+                value, (int, float)):
+            return False, None
+        self._pos = end
+        return True, value
+
+    def _parse(self) -> List[dict]:
+        items = []
+        while self._state != 'done':
+            char = self._skip_whitespace()
+            if not char:
+                break
+
+            if self._state == 'start':
+                self._expect(char, '{')
+                self._pos += 1
+                self._state = 'key'
+            elif self._state == 'key':
+                self._expect(char, '"}')
+                if char == '}':
+                    self._pos += 1
+                    self._state = 'done'
+                    continue
+                complete, self._current_key = self._decode_value()
+                if not complete:
+                    break
+                self._state = 'colon'
+            elif self._state == 'colon':
+                self._expect(char, ':')
+                self._pos += 1
+                self._state = 'value'
+            elif self._state == 'value':
+                if self._current_key == self.key:
+                    self._expect(char, '[')
+                    self._pos += 1
+                    self._state = 'item'
+                    continue
+                complete, _ = self._decode_value()
+                if not complete:
+                    break
+                self._state = 'next_key'
+            elif self._state == 'next_key':
+                self._expect(char, ',}')
+                self._pos += 1
+                self._state = 'key' if char == ',' else 'done'
+            elif self._state == 'item':
+                if char == ']':
+                    self._pos += 1
+                    self._state = 'next_key'
+                    continue
+                complete, item = self._decode_value()
+                if not complete:
+                    break
+                items.append(item)
+                self._state = 'next_item'
+            elif self._state == 'next_item':
+                self._expect(char, ',]')
+                self._pos += 1
+                self._state = 'item' if char == ',' else 'next_key'
+        return items
@@ -1,9 +1,130 @@
+import datetime
+import importlib
+import json
+import os
+import re
+import tempfile
 from urllib import parse
 
+import dateutil.parser
+import requests
+from requests.adapters import HTTPAdapter
+
 
 def build_url(root: str, folder: str = "/", querystring: dict = None):
     if not querystring:
         querystring = {}
     return "{}/{}?{}".format(
-        root, folder, parse.urlencode(querystring)
+        root.rstrip('/'), folder.lstrip('/'), parse.urlencode(querystring)
+    )
+
+# The shape of every timestamp returned by the API, i.e. 2016-04-02T11:13:07.71Z
+MONDO_TIMESTAMP = re.compile(
+    r'(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d+))?Z\Z'
+)
+
+
+def parse_datetime(value: str) -> datetime.datetime:
+    """
+    Parse a Mondo RFC 3339 timestamp into an aware (UTC) datetime.
+    Anything that doesn't match the expected shape goes through dateutil.
+
+    :param value: the timestamp string
+    :return: a datetime.datetime
+    """
+    match = MONDO_TIMESTAMP.match(value)
+    if match is None:
+        return dateutil.parser.parse(value)
+
+    year, month, day, hour, minute, second, fraction = match.groups()
+    return datetime.datetime(
+        int(year), int(month), int(day), int(hour), int(minute), int(second),
+        int(fraction[:6].ljust(6, '0')) if fraction else 0,
+        datetime.timezone.utc
     )
+
+
+def _fastest_json_loads():
+    for module in ('orjson', 'ujson'):
+        try:
+            return importlib.import_module(module).loads
+        except ImportError:
+            continue
+    return json.loads
+
+
+# The fastest JSON decoder installed, falling back to the standard library
+json_loads = _fastest_json_loads()
+
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def as_utc(value: datetime.datetime) -> datetime.datetime:
+    """
+    :param value: a datetime.datetime (naive ones are taken as UTC)
+    :return: the same moment, as an aware UTC datetime
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc)
+
+
+def epoch_microseconds(value) -> int:
+    """
+    :param value: a datetime.datetime (naive ones are taken as UTC)
+                  or an API timestamp string
+    :return: the microseconds since the epoch, exactly
+    """
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    return (as_utc(value) - EPOCH) // datetime.timedelta(microseconds=1)
+
+
+def format_cursor(value) -> str:
+    """
+    Format a pagination cursor for the since/before querystring parameters.
+    The API accepts either a RFC 3339 timestamp or a transaction id.
+
+    :param value: a datetime.datetime (naive ones are taken as UTC)
+                  or a transaction id
+    :return: the querystring value
+    """
+    if isinstance(value, datetime.datetime):
+        return as_utc(value).replace(tzinfo=None).isoformat('T') + 'Z'
+    return value
+
+
+def dump_json(data, path: str):
+    """
+    Write data as JSON to path atomically: to a temporary file in the same
+    directory first, renamed over path once complete (or removed on error)
+
+    :param data: anything json.dump can serialize
+    :param path: the destination file
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile(
+            'w', dir=directory, delete=False) as temporary:
+        try:
+            json.dump(data, temporary)
+        except BaseException:
+            temporary.close()
+            os.remove(temporary.name)
+            raise
+    os.replace(temporary.name, path)
+
+
+def build_session(pool_size: int = 10) -> requests.Session:
+    """
+    Build a requests.Session with a keep-alive connection pool
+    mounted for https (and http, for local testing)
+
+    :param pool_size: max number of connections kept alive per host
+    :return: a requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
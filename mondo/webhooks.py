@@ -0,0 +1,192 @@
+from collections import OrderedDict, defaultdict
+import asyncio
+import inspect
+import logging
+
+from aiohttp import web
+
+from mondo.mondo import Transaction
+
+logger = logging.getLogger(__name__)
+
+TRANSACTION_CREATED = 'transaction.created'
+
+
+class WebhookReceiver(object):
+    """
+    An embeddable asyncio HTTP server receiving the webhook events.
+
+    Events are parsed and acknowledged as soon as they are queued, then
+    dispatched to the registered handlers by a pool of workers. When the
+    queue is full the server stops acknowledging (503) so that the events
+    get redelivered later; repeated deliveries of the same transaction are
+    dropped. Transactions that can't be parsed are refused (400).
+    """
+
+    def __init__(self, client=None, path: str = '/webhook', workers: int = 4,
+                 queue_size: int = 1000, dedupe_size: int = 10000,
+                 enqueue_timeout: float = 5.0):
+        """
+        :param client: the MondoClient attached to the parsed Transactions
+        :param path: the URL path the webhook was registered with
+        :param workers: number of concurrent handler workers
+        :param queue_size: max number of events waiting for a worker
+        :param dedupe_size: number of recent transaction ids remembered
+        :param enqueue_timeout: how long a delivery waits for room
+                                in the queue before being refused
+        """
+        self._client = client
+        self.path = path
+        self._workers_count = workers
+        self._queue_size = queue_size
+        self._dedupe_size = dedupe_size
+        self._enqueue_timeout = enqueue_timeout
+        self._handlers = defaultdict(list)
+        self._seen = OrderedDict()
+        self._queue = None
+        self._workers = []
+        self._runner = None
+
+    def add_handler(self, handler, event_type: str = TRANSACTION_CREATED):
+        """
+        :param handler: a function or coroutine function, called with a
+                        Transaction for transaction.created events and with
+                        the event data otherwise
+        :param event_type: the event type to handle
+        """
+        self._handlers[event_type].append(handler)
+        return handler
+
+    def on(self, event_type: str = TRANSACTION_CREATED):
+        """
+        Decorator version of add_handler
+        """
+        def decorator(handler):
+            return self.add_handler(handler, event_type)
+        return decorator
+
+    @property
+    def app(self) -> web.Application:
+        """
+        An aiohttp application serving the webhook path, to embed in
+        an existing server (the workers still need start_workers())
+        """
+        app = web.Application()
+        app.router.add_post(self.path, self.handle)
+        return app
+
+    def start_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._queue_size)
+        self._workers = [
+            asyncio.ensure_future(self._work())
+            for _ in range(self._workers_count)
+        ]
+
+    async def start(self, host: str = '0.0.0.0', port: int = 8080):
+        """
+        Start the workers and the HTTP server
+        """
+        self.start_workers()
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+    @property
+    def port(self) -> int:
+        return self._runner.addresses[0][1]
+
+    async def join(self):
+        """
+        Wait until every queued event has been handled
+        """
+        await self._queue.join()
+
+    async def stop(self):
+        """
+        Stop accepting events, let the workers drain the queue and stop them
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        if self._queue is not None:
+            await self.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    def _is_duplicate(self, event_id: str) -> bool:
+        if event_id in self._seen:
+            self._seen.move_to_end(event_id)
+            return True
+        return False
+
+    def _remember(self, event_id: str):
+        self._seen[event_id] = True
+        while len(self._seen) > self._dedupe_size:
+            self._seen.popitem(last=False)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if self._queue is None:
+            return web.Response(status=503)
+        try:
+            event = await request.json()
+            event_type = event['type']
+            data = event['data']
+        except (ValueError, KeyError, TypeError):
+            return web.Response(status=400)
+
+        if event_type == TRANSACTION_CREATED:
+            try:
+                data = Transaction(client=self._client, **data)
+            except (TypeError, ValueError):
+                # refused, so that it isn't remembered as delivered
+                logger.warning('Refused an unparsable %s event', event_type)
+                return web.Response(status=400)
+            event_id = data.id
+        else:
+            event_id = data.get('id') if isinstance(data, dict) else None
+
+        if event_id:
+            if self._is_duplicate(event_id):
+                return web.Response(status=200)
+            # remembered before waiting, so a concurrent redelivery is dropped
+            self._remember(event_id)
+
+        try:
+            await asyncio.wait_for(
+                self._queue.put((event_type, data, event_id)),
+                self._enqueue_timeout)
+        except asyncio.TimeoutError:
+            self._seen.pop(event_id, None)
+            return web.Response(status=503)
+
+        return web.Response(status=200)
+
+    async def _work(self):
+        while True:
+            event_type, data, event_id = await self._queue.get()
+            try:
+                await self._dispatch(event_type, data)
+            except Exception:
+                logger.exception('Failed to handle a %s event', event_type)
+                # a later redelivery gets another chance
+                self._seen.pop(event_id, None)
+            finally:
+                self._queue.task_done()
+
+    async def _dispatch(self, event_type: str, data):
+        handlers = self._handlers.get(event_type)
+        if not handlers:
+            return
+        for handler in handlers:
+            result = handler(data)
+            if inspect.isawaitable(result):
+                await result
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+import requests
+
+from mondo.client import MondoClient
+from test.mock_server import MockMondoServer
+
+
+@pytest.fixture(scope='module')
+def server(request):
+    """
+    A MockMondoServer shared by the tests of a module, built with the
+    options of the module's MOCK_SERVER dict (if any)
+    """
+    options = dict(transactions=250)
+    options.update(getattr(request.module, 'MOCK_SERVER', {}))
+    with MockMondoServer(**options) as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    with make_client(server) as client:
+        yield client
+
+
+def make_client(server, token: str = 'randomToken', **kwargs) -> MondoClient:
+    """
+    :return: a MondoClient pointed at the mock server
+    """
+    client = MondoClient(token, **kwargs)
+    client.BASE_API_URL = server.url
+    return client
+
+
+def http_response(status: int, payload, headers: dict = None):
+    """
+    :return: a requests.Response, to mock Session.request with
+    """
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(payload).encode()
+    response.headers.update(headers or {})
+    return response
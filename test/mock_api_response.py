@@ -1,3 +1,6 @@
+import datetime
+import random
+
 WHOAMI_RESPONSE = {
     "authenticated": True,
     "client_id": "my_client_id",
@@ -209,3 +212,68 @@ BALANCE = {
     "currency": "GBP",
     "spend_today": -496
 }
+
+
+CATEGORIES = ['groceries', 'eating_out', 'transport', 'entertainment',
+              'shopping', 'bills', 'cash', 'general']
+
+
+def make_merchant(index):
+    merchant = dict(LIST_TRANSACTIONS['transactions'][1]['merchant'])
+    merchant.update({
+        'id': 'merch_{:020d}'.format(index),
+        'group_id': 'grp_{:020d}'.format(index),
+        'name': 'Merchant {}'.format(index),
+        'category': CATEGORIES[index % len(CATEGORIES)],
+    })
+    return merchant
+
+
+def generate_transactions(count, account_id='my_awesome_account_id',
+                          merchants=200, seed=0):
+    """
+    Generate `count` transactions shaped like LIST_TRANSACTIONS,
+    one every few minutes from 2016-01-01, with a top up every 50
+    and the merchants shared between transactions
+
+    :return: an iterator of transaction payloads, oldest first
+    """
+    rng = random.Random(seed)
+    shared_merchants = [make_merchant(index) for index in range(merchants)]
+    created = datetime.datetime(2016, 1, 1)
+    balance = 0
+
+    for index in range(count):
+        created += datetime.timedelta(seconds=rng.randint(60, 3600),
+                                      milliseconds=rng.randint(0, 999))
+        is_load = index % 50 == 0
+        amount = 10000 if is_load else -rng.randint(50, 5000)
+        balance += amount
+        merchant = None if is_load else shared_merchants[
+            rng.randrange(merchants)]
+        timestamp = '{:%Y-%m-%dT%H:%M:%S}.{:03d}Z'.format(
+            created, created.microsecond // 1000)
+
+        yield {
+            'id': 'tx_{:020d}'.format(index),
+            'created': timestamp,
+            'description': 'Initial top up' if is_load else merchant['name'],
+            'amount': amount,
+            'currency': 'GBP',
+            'merchant': merchant,
+            'notes': '',
+            'metadata': {},
+            'account_balance': balance,
+            'attachments': [],
+            'category': 'mondo' if is_load else merchant['category'],
+            'is_load': is_load,
+            'settled': timestamp,
+            'local_amount': amount,
+            'local_currency': 'GBP',
+            'updated': timestamp,
+            'account_id': account_id,
+            'counterparty': {},
+            'scheme': 'gps_mastercard',
+            'dedupe_id': str(index),
+            'originator': False
+        }
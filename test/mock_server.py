@@ -0,0 +1,211 @@
+"""
+A local stand-in for the Mondo API, serving generated data over real HTTP,
+with injectable latency and faults.
+
+    with MockMondoServer(transactions=10000, latency=0.01) as server:
+        client = MondoClient('token')
+        client.BASE_API_URL = server.url
+"""
+import asyncio
+import bisect
+import datetime
+import random
+import threading
+
+from aiohttp import web
+
+from mondo.utils import parse_datetime
+
+from test import mock_api_response as responses
+
+ACCOUNT_ID = 'my_awesome_account_id'
+
+
+class MockMondoServer(object):
+    def __init__(self, transactions: int = 1000, latency: float = 0.0,
+                 fault_rate: float = 0.0, fault_statuses=(429, 503),
+                 retry_after: int = 0, seed: int = 0,
+                 host: str = '127.0.0.1', port: int = 0):
+        """
+        :param transactions: number of generated transactions
+        :param latency: seconds added to every response
+        :param fault_rate: probability of answering with a fault
+        :param fault_statuses: the statuses used for the faults
+        :param retry_after: the Retry-After sent with the 429s
+        :param seed: seed of the generated data and of the faults
+        """
+        self.latency = latency
+        self.fault_rate = fault_rate
+        self.fault_statuses = fault_statuses
+        self.retry_after = retry_after
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.faults = 0
+        self._random = random.Random(seed)
+        self._transactions = list(responses.generate_transactions(
+            transactions, ACCOUNT_ID, seed=seed))
+        self._by_id = {
+            transaction['id']: index
+            for index, transaction in enumerate(self._transactions)
+        }
+        self._created = [
+            parse_datetime(t['created']) for t in self._transactions]
+        self._webhooks = {}
+        self._loop = None
+        self._runner = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return 'http://{}:{}'.format(self.host, self.port)
+
+    @property
+    def transactions(self) -> list:
+        return self._transactions
+
+    def start(self):
+        """
+        Serve from a background thread, with its own event loop
+        """
+        started = threading.Event()
+        self._loop = asyncio.new_event_loop()
+
+        def serve():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self._start())
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=serve, daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(
+            self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    async def _start(self):
+        app = web.Application(middlewares=[self._faults])
+        app.router.add_get('/ping/whoami', self.whoami)
+        app.router.add_get('/accounts', self.accounts)
+        app.router.add_get('/balance', self.balance)
+        app.router.add_get('/transactions', self.list_transactions)
+        app.router.add_get('/transactions/{id}', self.get_transaction)
+        app.router.add_patch('/transactions/{id}', self.annotate_transaction)
+        app.router.add_get('/webhooks', self.list_webhooks)
+        app.router.add_post('/webhooks', self.register_webhook)
+        app.router.add_delete('/webhooks/{id}', self.delete_webhook)
+        app.router.add_post('/attachment/register', self.register_attachment)
+        app.router.add_post('/attachment/deregister', self.empty)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    @web.middleware
+    async def _faults(self, request, handler):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.fault_rate and self._random.random() < self.fault_rate:
+            self.faults += 1
+            status = self._random.choice(self.fault_statuses)
+            headers = {'Retry-After': str(self.retry_after)} \
+                if status == 429 else {}
+            return web.json_response(
+                {'message': 'Injected fault'}, status=status, headers=headers)
+        return await handler(request)
+
+    def _transaction(self, request):
+        index = self._by_id.get(request.match_info['id'])
+        if index is None:
+            raise web.HTTPNotFound(
+                text='{"message": "Transaction not found"}',
+                content_type='application/json')
+        return self._transactions[index]
+
+    async def whoami(self, request):
+        return web.json_response(responses.WHOAMI_RESPONSE)
+
+    async def accounts(self, request):
+        return web.json_response(responses.LIST_ACCOUNTS)
+
+    async def balance(self, request):
+        balance = self._transactions[-1]['account_balance'] \
+            if self._transactions else 0
+        return web.json_response(dict(responses.BALANCE, balance=balance))
+
+    async def list_transactions(self, request):
+        since = request.query.get('since')
+        before = request.query.get('before')
+        # capped, as by the API
+        limit = min(int(request.query.get('limit', 100)), 100)
+
+        start = 0
+        if since in self._by_id:
+            start = self._by_id[since] + 1
+        elif since:
+            start = bisect.bisect_right(self._created, parse_datetime(since))
+        end = len(self._transactions)
+        if before:
+            end = bisect.bisect_left(self._created, parse_datetime(before))
+
+        return web.json_response({
+            'transactions': self._transactions[start:min(end, start + limit)]
+        })
+
+    async def get_transaction(self, request):
+        return web.json_response({'transaction': self._transaction(request)})
+
+    async def annotate_transaction(self, request):
+        transaction = self._transaction(request)
+        form = await request.post()
+        for key, value in form.items():
+            if key.startswith('metadata[') and key.endswith(']'):
+                transaction['metadata'][key[len('metadata['):-1]] = value
+        return web.json_response({'transaction': transaction})
+
+    async def list_webhooks(self, request):
+        return web.json_response({'webhooks': list(self._webhooks.values())})
+
+    async def register_webhook(self, request):
+        form = await request.post()
+        webhook = {
+            'id': 'webhook_{}'.format(len(self._webhooks)),
+            'account_id': form['account_id'],
+            'url': form['url'],
+        }
+        self._webhooks[webhook['id']] = webhook
+        return web.json_response({'webhook': webhook})
+
+    async def delete_webhook(self, request):
+        self._webhooks.pop(request.match_info['id'], None)
+        return web.json_response({})
+
+    async def register_attachment(self, request):
+        form = await request.post()
+        return web.json_response({'attachment': {
+            'id': 'attach_{}'.format(form['external_id']),
+            'user_id': 'my_user_id',
+            'external_id': form['external_id'],
+            'file_url': form['file_url'],
+            'file_type': form['file_type'],
+            'created': '{:%Y-%m-%dT%H:%M:%S}Z'.format(
+                datetime.datetime.utcnow()),
+        }})
+
+    async def empty(self, request):
+        return web.json_response({})
+
@@ -0,0 +1,149 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from mondo import AsyncMondoClient
+from mondo.balance import BalanceTracker
+from mondo.batch import BatchExecutor
+from mondo.client import MondoClient
+from mondo.mondo import MondoApi
+from mondo.pool import ClientPool
+from test import mock_api_response as responses
+from test.mock_server import ACCOUNT_ID
+
+
+def run(server, coroutine_function, client_class=AsyncMondoClient):
+    client = client_class('randomToken')
+    client.BASE_API_URL = server.url
+
+    async def main():
+        async with client:
+            return await coroutine_function(client)
+
+    return asyncio.run(main())
+
+
+def test_async_twins_of_the_read_methods(server):
+    async def read(client):
+        return (await client.whoami_async(),
+                await client.list_accounts_async(),
+                await client.get_balance_async(ACCOUNT_ID),
+                await client.list_transactions_async(ACCOUNT_ID, limit=10))
+
+    whoami, accounts, balance, transactions = run(server, read, MondoClient)
+
+    assert whoami['authenticated']
+    assert accounts[0].id == ACCOUNT_ID
+    assert balance.amount.minor == server.transactions[-1]['account_balance']
+    assert [t.id for t in transactions] == [
+        t['id'] for t in server.transactions[:10]]
+
+
+def test_async_client_methods_are_coroutines(server):
+    async def read(client):
+        account = await client.default_account
+        transaction = await client.get_transaction(
+            server.transactions[1]['id'])
+        frame = await client.transactions_frame(ACCOUNT_ID, page_size=50)
+        ids = [t.id async for t in client.iter_transactions(
+            ACCOUNT_ID, page_size=50)]
+        return account, transaction, frame, ids
+
+    account, transaction, frame, ids = run(server, read)
+
+    assert account.id == ACCOUNT_ID
+    assert transaction.merchant.name.startswith('Merchant')
+    assert len(frame) == len(server.transactions)
+    assert ids == [t['id'] for t in server.transactions]
+
+
+def test_async_entity_methods(server):
+    async def write(client):
+        account = await client.default_account
+        webhook = await account.register_webhook_async('http://example.com')
+        listed = await account.list_webhooks_async()
+        await webhook.delete_async()
+
+        transactions = await account.list_transactions_async(limit=1)
+        annotated = await transactions[0].add_metadata_async({'note': 'hi'})
+        attachment = await transactions[0].register_attachment_async(
+            'http://example.com/receipt.png', 'image/png')
+        await attachment.deregister_async()
+        balance = await account.get_balance_async()
+        return webhook, listed, annotated, attachment, balance
+
+    webhook, listed, annotated, attachment, balance = run(server, write)
+
+    assert [w.id for w in listed] == [webhook.id]
+    assert not webhook.active
+    assert annotated.metadata['note'] == 'hi'
+    assert attachment.external_id == annotated.id
+    assert balance.currency == 'GBP'
+
+
+@mock.patch.object(MondoApi, '_make_async_request')
+@mock.patch.object(MondoApi, '_make_request')
+def test_sync_and_async_list_transactions_send_the_same_parameters(
+        mock_request, mock_async_request):
+    mock_request.return_value = responses.LIST_TRANSACTIONS
+    mock_async_request.return_value = responses.LIST_TRANSACTIONS
+    client = MondoClient('randomToken')
+
+    client.list_transactions('my_account', limit=5)
+    asyncio.run(client.list_transactions_async('my_account', limit=5))
+
+    assert mock_async_request.call_args[0][1] == mock_request.call_args[0][1]
+    assert mock_async_request.call_args[0][1]['expand[]'] == 'merchant'
+
+
+def test_pool_balances_async(server):
+    async def balances():
+        async with ClientPool() as pool:
+            for tenant in ('alice', 'bob'):
+                pool.add(tenant, 'token').BASE_API_URL = server.url
+            return await pool.balances_async()
+
+    results = asyncio.run(balances())
+
+    assert sorted(results) == ['alice', 'bob']
+    assert all(r.error is None for r in results.values())
+    assert results['bob'].result.currency == 'GBP'
+
+
+def test_sync_entity_helpers_refuse_an_async_client(server):
+    async def entities(client):
+        account = await client.default_account
+        transaction = (await client.list_transactions(ACCOUNT_ID, limit=1))[0]
+        webhook = await client.register_webhook(ACCOUNT_ID, 'http://a.com')
+        attachment = await client.register_attachment(
+            transaction.id, 'http://a.com/r.png', 'image/png')
+        return account, transaction, webhook, attachment
+
+    account, transaction, webhook, attachment = run(server, entities)
+    requests = server.requests
+
+    calls = [
+        account.get_balance, account.list_webhooks, account.iter_transactions,
+        lambda: account.transactions,
+        lambda: account.register_webhook('http://b.com'),
+        lambda: transaction.add_metadata({'a': 'b'}),
+        lambda: setattr(transaction, 'notes', 'x'),
+        lambda: transaction.register_attachment('http://a.com', 'image/png'),
+        attachment.deregister, webhook.delete,
+    ]
+    for call in calls:
+        with pytest.raises(TypeError):
+            call()
+
+    assert server.requests == requests
+    assert webhook.active
+
+
+def test_blocking_helpers_refuse_an_async_client():
+    client = AsyncMondoClient('randomToken')
+
+    with pytest.raises(TypeError):
+        BatchExecutor(client)
+    with pytest.raises(TypeError):
+        BalanceTracker(client, ACCOUNT_ID)
@@ -0,0 +1,93 @@
+import threading
+import time
+from unittest import mock
+
+from mondo.authorization import MondoAccess, TokenManager
+from mondo.client import MondoClient
+from test import mock_api_response as responses
+from test.conftest import http_response
+
+
+def _access(token, expires_in=3600):
+    return MondoAccess(
+        access_token=token, client_id='my_client_id', expires_in=expires_in,
+        refresh_token='refresh_' + token, token_type='Bearer',
+        user_id='my_user_id')
+
+
+@mock.patch('mondo.authorization.refresh_access_token')
+def test_concurrent_refreshes_are_coalesced(mock_refresh):
+    def slow_refresh(*args, **kwargs):
+        time.sleep(0.05)
+        return _access('fresh')
+    mock_refresh.side_effect = slow_refresh
+
+    manager = TokenManager('client', 'secret', _access('stale', expires_in=30),
+                           refresh_margin=60, background=False)
+    tokens = []
+    threads = [threading.Thread(target=lambda: tokens.append(
+        manager.access_token)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert tokens == ['fresh'] * 8
+    assert mock_refresh.call_count == 1
+    assert mock_refresh.call_args[0][2] == 'refresh_stale'
+
+
+@mock.patch('mondo.authorization.refresh_access_token')
+def test_tokens_are_persisted(mock_refresh, tmpdir):
+    mock_refresh.return_value = _access('fresh')
+    path = str(tmpdir.join('tokens.json'))
+
+    manager = TokenManager('client', 'secret', _access('stale'), path=path,
+                           background=False)
+    manager.refresh()
+    loaded = TokenManager.load('client', 'secret', path, background=False)
+
+    assert loaded.access == _access('fresh')
+    assert loaded.expires_at == manager.expires_at
+    assert loaded.access_token == 'fresh'
+    assert mock_refresh.call_count == 1
+
+
+@mock.patch('mondo.authorization.refresh_access_token')
+def test_client_retries_once_after_a_401(mock_refresh):
+    mock_refresh.return_value = _access('fresh')
+    manager = TokenManager('client', 'secret', _access('revoked'),
+                           background=False)
+    client = MondoClient(token_manager=manager)
+
+    with mock.patch.object(client.session, 'request', side_effect=[
+        http_response(401, {'message': 'expired'}),
+        http_response(200, responses.BALANCE),
+    ]) as mock_request:
+        client.get_balance('my_awesome_account_id')
+
+    headers = [call[1]['headers']['Authorization']
+               for call in mock_request.call_args_list]
+    assert headers == ['Bearer revoked', 'Bearer fresh']
+
+
+@mock.patch('mondo.authorization.refresh_access_token')
+def test_managers_start_no_thread_by_default(mock_refresh):
+    mock_refresh.return_value = _access('fresh')
+    threads = threading.active_count()
+
+    managers = [TokenManager('client', 'secret', _access('token_{}'.format(i)))
+                for i in range(50)]
+    managers[0].refresh()
+
+    assert threading.active_count() == threads
+    assert all(manager._timer is None for manager in managers)
+
+
+def test_background_refresh_is_opt_in():
+    manager = TokenManager('client', 'secret', _access('token'),
+                           background=True)
+    try:
+        assert manager._timer is not None and manager._timer.daemon
+    finally:
+        manager.close()
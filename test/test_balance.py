@@ -0,0 +1,46 @@
+import datetime
+from unittest import mock
+
+from mondo.balance import BalanceTracker
+from mondo.mondo import Transaction
+from test import mock_api_response as responses
+
+
+def _transaction(transaction_id, amount, account_balance, seconds=1):
+    created = datetime.datetime.utcnow() + datetime.timedelta(seconds=seconds)
+    return Transaction(**dict(
+        responses.LIST_TRANSACTIONS['transactions'][1], id=transaction_id,
+        amount=amount, account_balance=account_balance,
+        created=created.strftime('%Y-%m-%dT%H:%M:%S.%fZ')))
+
+
+def _tracker():
+    client = mock.Mock()
+    client.get_balance.return_value = dict(responses.BALANCE)
+    return client, BalanceTracker(client, 'my_awesome_account_id')
+
+
+def test_tracker_follows_transactions_without_fetching():
+    client, tracker = _tracker()
+    assert tracker.balance.amount.minor == 1951
+
+    assert tracker.apply(_transaction('tx_1', -451, 1500))
+    assert not tracker.apply(_transaction('tx_1', -451, 1500))
+    assert tracker.apply(_transaction('tx_2', 1000, 2500, seconds=2))
+
+    balance = tracker.balance
+    assert balance.amount.minor == 2500
+    assert balance.spent_today.minor == -496 - 451
+    assert client.get_balance.call_count == 1
+
+
+def test_tracker_reanchors_on_drift():
+    client, tracker = _tracker()
+    tracker.anchor()
+
+    tracker.apply(_transaction('tx_1', -100, 1000))
+    assert tracker.drifted
+
+    tracker.balance
+    assert client.get_balance.call_count == 2
+    assert not tracker.drifted
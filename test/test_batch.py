@@ -0,0 +1,50 @@
+import threading
+import time
+
+from mondo import batch
+from mondo.exceptions import MondoApiException
+
+
+class FakeClient(object):
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def annotate_transaction(self, transaction_id, metadata):
+        time.sleep(0.01 if metadata.get('step') == 1 else 0)
+        with self.lock:
+            self.calls.append((transaction_id, metadata['step']))
+        return transaction_id
+
+    def delete_webhook(self, webhook_id):
+        raise MondoApiException('webhook not found')
+
+
+def test_batch_preserves_per_key_order():
+    client = FakeClient()
+    operations = [
+        batch.annotate_transaction(transaction_id, {'step': step})
+        for step in (1, 2, 3) for transaction_id in ('tx_1', 'tx_2')
+    ]
+
+    result = batch.BatchExecutor(client, concurrency=4, max_pending=3).run(
+        iter(operations))
+
+    assert result.ok
+    assert [r.result for r in result] == ['tx_1', 'tx_2'] * 3
+    for transaction_id in ('tx_1', 'tx_2'):
+        assert [step for tx, step in client.calls if tx == transaction_id] == [
+            1, 2, 3]
+
+
+def test_batch_reports_partial_failures():
+    result = batch.BatchExecutor(FakeClient()).run([
+        batch.annotate_transaction('tx_1', {'step': 2}),
+        batch.delete_webhook('webhook_1'),
+    ])
+
+    assert not result.ok
+    assert len(result.succeeded) == 1
+    failure, = result.failed
+    assert failure.operation.key == 'webhook_1'
+    assert isinstance(failure.error, MondoApiException)
@@ -0,0 +1,33 @@
+import json
+
+from benchmarks import models
+
+
+def test_compare_flags_the_regressions_beyond_the_tolerance():
+    baseline = {'a': {'time': 1.0, 'peak': 1 << 20},
+                'b': {'time': 1.0, 'peak': 1 << 20}}
+    results = {'a': {'time': 1.2, 'peak': 1 << 20},
+               'b': {'time': 1.5, 'peak': 2 << 20},
+               'c': {'time': 9.0, 'peak': 9 << 20}}
+
+    regressions = models.compare(results, baseline, tolerance=0.25)
+
+    assert [r.split(':')[0] for r in regressions] == ['b', 'b']
+
+
+def test_compare_ignores_the_noise_on_tiny_cases():
+    baseline = {'a': {'time': 0.0001, 'peak': 512}}
+    results = {'a': {'time': 0.0003, 'peak': 2048}}
+
+    assert models.compare(results, baseline, tolerance=0.25) == []
+
+
+def test_run_stores_the_baselines(tmpdir):
+    path = str(tmpdir.join('baselines.json'))
+
+    assert models.run([50], update=True, path=path) == []
+
+    with open(path) as baselines:
+        stored = json.load(baselines)
+    assert set(stored['50']) == set(models.CASES)
+    assert stored['50']['transaction_init']['peak'] > 0
@@ -0,0 +1,72 @@
+import time
+from unittest import mock
+
+from mondo.cache import CacheKey, LRUCache, SQLiteCache
+from mondo.client import MondoClient
+from test import mock_api_response as responses
+from test.conftest import http_response
+
+
+def test_client_caches_gets_until_a_write():
+    client = MondoClient('randomToken', cache=LRUCache())
+    with mock.patch.object(client.session, 'request', side_effect=[
+        http_response(200, responses.SINGLE_TRANSACTION),
+        http_response(200, responses.SINGLE_TRANSACTION),
+        http_response(200, responses.SINGLE_TRANSACTION),
+        http_response(200, responses.LIST_ACCOUNTS),
+    ]) as mock_request:
+        client.get_transaction('tx_000096mpvjzID9HS0XDIEj')
+        client.get_transaction('tx_000096mpvjzID9HS0XDIEj')
+        assert mock_request.call_count == 1
+
+        client.annotate_transaction('tx_000096mpvjzID9HS0XDIEj', {'a': 'b'})
+        client.get_transaction('tx_000096mpvjzID9HS0XDIEj')
+        assert mock_request.call_count == 3
+
+        assert client.default_account.id == client.default_account.id
+        assert mock_request.call_count == 4
+
+
+def test_cached_payloads_are_copies():
+    client = MondoClient('randomToken', cache=LRUCache())
+    with mock.patch.object(client.session, 'request', side_effect=[
+        http_response(200, responses.SINGLE_TRANSACTION),
+    ]):
+        transaction = client.get_transaction('tx_000096mpvjzID9HS0XDIEj')
+        transaction.metadata['note'] = 'mutated'
+        raw = client.get_transaction('tx_000096mpvjzID9HS0XDIEj', raw=True)
+        raw['description'] = 'mutated'
+
+        cached = client.get_transaction('tx_000096mpvjzID9HS0XDIEj')
+
+    assert 'note' not in cached.metadata
+    assert cached.description != 'mutated'
+
+
+def test_lru_cache_evicts_and_expires():
+    cache = LRUCache(maxsize=2, ttls={'/balance': 0.05}, default_ttl=60)
+    keys = [CacheKey('scope', path, '') for path in
+            ('/accounts', '/webhooks', '/transactions')]
+    for key in keys:
+        cache.set(key, {'path': key.path})
+
+    assert len(cache) == 2
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) == {'path': '/transactions'}
+
+    balance = CacheKey('scope', '/balance', '')
+    cache.set(balance, {'balance': 1})
+    time.sleep(0.06)
+    assert cache.get(balance) is None
+
+
+def test_sqlite_cache_is_shared_through_the_file(tmpdir):
+    path = str(tmpdir.join('cache.db'))
+    key = CacheKey('scope', '/transactions/tx_1', 'expand%5B%5D=merchant')
+
+    SQLiteCache(path).set(key, responses.SINGLE_TRANSACTION)
+    other = SQLiteCache(path)
+
+    assert other.get(key) == responses.SINGLE_TRANSACTION
+    other.invalidate('/transactions')
+    assert SQLiteCache(path).get(key) is None
@@ -0,0 +1,127 @@
+import csv
+import datetime
+import json
+
+import pytest
+
+from mondo.export import Schema, TransactionExporter, read_columnar, resolve
+from mondo.utils import dump_json
+from test import mock_api_response as responses
+from test.mock_server import ACCOUNT_ID
+
+
+def test_resolve_flattens_nested_paths():
+    transaction = dict(responses.LIST_TRANSACTIONS['transactions'][1],
+                       attachments=[{'file_url': 'a'}, {'file_url': 'b'}])
+
+    assert resolve(transaction, 'merchant.address.city') == 'London'
+    assert resolve(transaction, 'attachments.file_url') == ['a', 'b']
+    assert resolve(transaction, 'metadata.missing') is None
+    assert resolve(transaction, 'merchant.name.first') is None
+
+
+def test_export_csv(server, client, tmpdir):
+    path = str(tmpdir.join('transactions.csv'))
+
+    result = client.export_transactions(ACCOUNT_ID, path, chunk_size=60)
+
+    with open(path) as exported:
+        rows = list(csv.DictReader(exported))
+    assert result.rows == len(rows) == 250
+    assert result.cursor == server.transactions[-1]['id']
+    assert [row['id'] for row in rows] == [
+        t['id'] for t in server.transactions]
+    assert rows[1]['merchant.name'] == server.transactions[1]['merchant']['name']
+    assert rows[0]['merchant.name'] == ''
+
+
+def test_export_jsonl_with_a_custom_schema(server, client, tmpdir):
+    path = str(tmpdir.join('transactions.jsonl'))
+    schema = Schema(['id', 'merchant.name',
+                     ('pounds', lambda t: t['amount'] / 100)])
+
+    client.export_transactions(ACCOUNT_ID, path, 'jsonl', schema=schema)
+
+    with open(path) as exported:
+        rows = [json.loads(line) for line in exported]
+    assert len(rows) == 250
+    assert rows[2] == {
+        'id': server.transactions[2]['id'],
+        'merchant.name': server.transactions[2]['merchant']['name'],
+        'pounds': server.transactions[2]['amount'] / 100,
+    }
+
+
+def test_export_columnar(server, client, tmpdir):
+    path = str(tmpdir.join('transactions.cols.gz'))
+
+    client.export_transactions(ACCOUNT_ID, path, 'columnar', chunk_size=100)
+
+    rows = list(read_columnar(path))
+    assert [row['id'] for row in rows] == [
+        t['id'] for t in server.transactions]
+    assert rows[3]['amount'] == server.transactions[3]['amount']
+
+
+@pytest.mark.parametrize('format', ['csv', 'jsonl', 'columnar'])
+def test_interrupted_export_resumes_without_duplicates(
+        server, client, tmpdir, format):
+    path = str(tmpdir.join('transactions'))
+    exporter = TransactionExporter(client, Schema(['id']), chunk_size=100)
+
+    def interrupt(written):
+        # a partially written chunk, not recorded in the state
+        with open(path, 'ab') as output:
+            output.write(b'garbage')
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        exporter.export(ACCOUNT_ID, path, format, on_chunk=interrupt)
+    result = exporter.export(ACCOUNT_ID, path, format)
+
+    assert result.resumed
+    assert result.rows == 150
+    if format == 'csv':
+        with open(path) as exported:
+            ids = [row['id'] for row in csv.DictReader(exported)]
+    elif format == 'jsonl':
+        with open(path) as exported:
+            ids = [json.loads(line)['id'] for line in exported]
+    else:
+        ids = [row['id'] for row in read_columnar(path)]
+    assert ids == [t['id'] for t in server.transactions]
+
+    # a later run only appends the new transactions: none here
+    assert exporter.export(ACCOUNT_ID, path, format).rows == 0
+
+
+def test_state_of_another_schema_is_refused(client, tmpdir):
+    path = str(tmpdir.join('transactions.csv'))
+    client.export_transactions(ACCOUNT_ID, path, schema=Schema(['id']))
+
+    with pytest.raises(ValueError):
+        client.export_transactions(ACCOUNT_ID, path)
+
+
+def test_unknown_format(client, tmpdir):
+    with pytest.raises(ValueError):
+        client.export_transactions(
+            ACCOUNT_ID, str(tmpdir.join('out')), 'parquet')
+
+
+def test_export_since_a_date_saves_a_string_cursor(client, tmpdir):
+    path = str(tmpdir.join('transactions.csv'))
+
+    result = client.export_transactions(
+        ACCOUNT_ID, path, since=datetime.datetime(2030, 1, 1))
+
+    assert result.rows == 0
+    with open(path + '.state') as state:
+        assert json.load(state)['cursor'] == '2030-01-01T00:00:00Z'
+
+
+def test_failed_state_write_leaves_no_temporary_file(tmpdir):
+    with pytest.raises(TypeError):
+        dump_json({'cursor': object()}, str(tmpdir.join('state')))
+
+    assert tmpdir.listdir() == []
@@ -0,0 +1,54 @@
+import datetime
+import time
+
+from mondo.frame import TransactionFrame
+from test import mock_api_response as responses
+
+
+def test_frame_aggregations():
+    frame = TransactionFrame.from_response(responses.LIST_TRANSACTIONS)
+
+    assert len(frame) == 3
+    assert frame.sum() == 8800
+    assert frame.group_by('category') == {
+        'mondo': 10000, 'groceries': -650, 'eating_out': -550
+    }
+    assert frame.column('merchant') == [
+        None, 'merch_000095xksYP6PjOgasZ12v', 'merch_000094POsckvNp2Gl0bhgn'
+    ]
+    assert frame.bucket('day') == {
+        datetime.date(2016, 4, 2): 9350, datetime.date(2016, 4, 4): -550
+    }
+    assert frame.bucket('month') == {datetime.date(2016, 4, 1): 8800}
+
+
+def test_frame_filter():
+    frame = TransactionFrame.from_response(responses.LIST_TRANSACTIONS)
+
+    spending = frame.filter(spending=True)
+    assert spending.ids == ['tx_0001', 'tx_000096r3teLiNZoK0CA5th']
+    assert spending.group_by('category') == {
+        'groceries': -650, 'eating_out': -550
+    }
+
+    since = datetime.datetime(2016, 4, 3, tzinfo=datetime.timezone.utc)
+    assert frame.filter(since=since, currency='GBP').ids == [
+        'tx_000096r3teLiNZoK0CA5th'
+    ]
+    assert len(frame.filter(category='unknown')) == 0
+
+
+def test_frame_filter_takes_naive_datetimes_as_utc(monkeypatch):
+    monkeypatch.setenv('TZ', 'America/New_York')
+    time.tzset()
+    try:
+        frame = TransactionFrame.from_response(responses.LIST_TRANSACTIONS)
+
+        since = frame.filter(since=datetime.datetime(2016, 4, 4, 10, 0))
+        before = frame.filter(before=datetime.datetime(2016, 4, 4, 12, 8))
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+    assert since.ids == ['tx_000096r3teLiNZoK0CA5th']
+    assert 'tx_000096r3teLiNZoK0CA5th' not in before.ids
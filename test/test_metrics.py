@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from mondo.exceptions import MondoApiException
+from mondo.metrics import Histogram, Metrics, endpoint_template
+from mondo.retry import RetryPolicy
+from test.conftest import make_client
+from test.mock_server import ACCOUNT_ID, MockMondoServer
+
+MOCK_SERVER = {'transactions': 30}
+
+
+@pytest.mark.parametrize('url,template', [
+    ('/transactions', '/transactions'),
+    ('/transactions/tx_00001', '/transactions/{id}'),
+    ('/webhooks/webhook_1/', '/webhooks/{id}'),
+    ('/ping/whoami', '/ping/whoami'),
+    ('attachment/register', '/attachment/register'),
+])
+def test_endpoint_template(url, template):
+    assert endpoint_template(url) == template
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(buckets=(0.1, 1))
+    for value in [0.05] * 98 + [0.5, 5]:
+        histogram.observe(value)
+
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.99) == 1
+    assert histogram.quantile(1) == float('inf')
+    assert histogram.cumulative() == [(0.1, 98), (1, 99), (float('inf'), 100)]
+
+
+def test_records_an_event_per_request(server):
+    events = []
+    metrics = Metrics(hooks=[events.append])
+    with make_client(server, metrics=metrics) as client:
+        client.get_balance(ACCOUNT_ID)
+        client.get_transaction(server.transactions[0]['id'])
+        client.get_transaction(server.transactions[1]['id'])
+        with pytest.raises(MondoApiException):
+            client.get_transaction('tx_missing')
+
+    assert [(e.endpoint, e.method, e.status) for e in events] == [
+        ('/balance', 'GET', 200),
+        ('/transactions/{id}', 'GET', 200),
+        ('/transactions/{id}', 'GET', 200),
+        ('/transactions/{id}', 'GET', 404),
+    ]
+    assert all(e.bytes > 0 for e in events[:3])
+    assert all(0 <= e.ttfb <= e.elapsed for e in events[:3])
+    assert events[-1].error == 'MondoApiException'
+
+    stats = metrics['/transactions/{id}', 'GET']
+    assert stats.requests == 3
+    assert stats.errors == 1
+    assert stats.statuses == {200: 2, 404: 1}
+
+
+def test_counts_the_retries():
+    events = []
+    metrics = Metrics(hooks=[events.append])
+    with MockMondoServer(transactions=5, fault_rate=0.5, seed=1) as server:
+        with make_client(server, metrics=metrics, retry_policy=RetryPolicy(
+                max_retries=20, backoff_factor=0)) as client:
+            for _ in range(10):
+                client.get_balance(ACCOUNT_ID)
+
+    assert sum(e.retries for e in events) == server.faults
+    assert metrics['/balance', 'GET'].retries == server.faults
+
+
+def test_async_and_streamed_requests(server):
+    metrics = Metrics()
+    client = make_client(server, metrics=metrics)
+
+    async def fetch():
+        async with client:
+            await client.get_transaction_async(server.transactions[0]['id'])
+            return [t async for t in client.stream_transactions_async(
+                ACCOUNT_ID)]
+
+    assert len(asyncio.run(fetch())) == 30
+    assert len(list(client.stream_transactions(ACCOUNT_ID))) == 30
+
+    snapshot = metrics.snapshot()
+    assert snapshot['GET /transactions/{id}']['requests'] == 1
+    assert snapshot['GET /transactions']['requests'] == 2
+    assert snapshot['GET /transactions']['bytes'] > 0
+
+
+def test_prometheus_export(server):
+    metrics = Metrics()
+    with make_client(server, metrics=metrics) as client:
+        client.list_accounts()
+
+    text = metrics.prometheus()
+
+    assert 'mondo_requests_total{endpoint="/accounts",method="GET",' \
+           'status="200"} 1' in text
+    assert 'mondo_request_duration_seconds_bucket{endpoint="/accounts",' \
+           'method="GET",le="+Inf"} 1' in text
+
+
+def test_failing_hooks_are_logged(server):
+    metrics = Metrics(hooks=[lambda event: 1 / 0])
+    with make_client(server, metrics=metrics) as client:
+        client.list_accounts()
+
+    assert metrics['/accounts', 'GET'].requests == 1
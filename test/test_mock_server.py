@@ -0,0 +1,104 @@
+import asyncio
+import datetime
+
+import pytest
+
+from mondo.exceptions import MondoApiException
+from mondo.retry import RetryPolicy
+from test.conftest import make_client
+from test.mock_server import ACCOUNT_ID, MockMondoServer
+
+
+def test_accounts_and_balance(server, client):
+    accounts = client.list_accounts()
+    balance = client.get_balance(ACCOUNT_ID)
+
+    assert accounts[0].id == 'my_awesome_account_id'
+    assert balance.amount.minor == server.transactions[-1]['account_balance']
+
+
+def test_paginates_every_transaction(server, client):
+    transactions = list(client.iter_transactions(ACCOUNT_ID, page_size=100))
+
+    assert [t.id for t in transactions] == [
+        t['id'] for t in server.transactions]
+    assert transactions[1].merchant.name.startswith('Merchant')
+
+
+def test_page_size_above_the_api_limit(server, client):
+    async def iterate():
+        async with client:
+            return [t.id async for t in client.iter_transactions_async(
+                ACCOUNT_ID, page_size=500)]
+
+    ids = [t['id'] for t in server.transactions]
+
+    assert [t.id for t in client.iter_transactions(
+        ACCOUNT_ID, page_size=500)] == ids
+    assert asyncio.run(iterate()) == ids
+    assert len(client.transactions_frame(ACCOUNT_ID, page_size=500)) == 250
+    assert client.open_store().sync(ACCOUNT_ID, page_size=500) == 250
+
+
+def test_since_and_before_timestamps(server, client):
+    since = server.transactions[9]['created']
+    before = server.transactions[20]['created']
+
+    transactions = client.list_transactions(
+        ACCOUNT_ID, since=datetime.datetime.strptime(
+            since, '%Y-%m-%dT%H:%M:%S.%fZ'),
+        before=datetime.datetime.strptime(before, '%Y-%m-%dT%H:%M:%S.%fZ'))
+
+    assert [t.id for t in transactions] == [
+        t['id'] for t in server.transactions[10:20]]
+
+
+def test_unknown_transaction(client):
+    with pytest.raises(MondoApiException) as error:
+        client.get_transaction('tx_missing')
+
+    assert error.value.status_code == 404
+
+
+def test_webhooks_round_trip(client):
+    webhook = client.register_webhook(ACCOUNT_ID, 'http://example.com/hook')
+
+    assert [w.id for w in client.list_webhooks(ACCOUNT_ID)] == [webhook.id]
+    webhook.delete()
+    assert client.list_webhooks(ACCOUNT_ID) == []
+
+
+def test_retries_the_injected_faults():
+    with MockMondoServer(transactions=10, fault_rate=0.5, seed=1) as server:
+        client = make_client(server, retry_policy=RetryPolicy(
+            max_retries=20, backoff_factor=0))
+
+        with client:
+            balances = [client.get_balance(ACCOUNT_ID) for _ in range(20)]
+
+        assert len(balances) == 20
+        assert server.faults > 0
+        assert server.requests == 20 + server.faults
+
+
+def test_async_transactions(server):
+    client = make_client(server)
+    ids = [t['id'] for t in server.transactions[:50]]
+
+    async def fetch():
+        async with client:
+            return await client.get_transactions_async(ids, concurrency=10)
+
+    results = asyncio.run(fetch())
+
+    assert [r.transaction.id for r in results] == ids
+
+
+def test_async_calls_from_successive_event_loops(server):
+    client = make_client(server)
+
+    first = asyncio.run(client.list_transactions_async(ACCOUNT_ID, limit=5))
+    second = asyncio.run(client.list_transactions_async(ACCOUNT_ID, limit=5))
+
+    assert [t.id for t in first] == [t.id for t in second]
+    asyncio.run(client.aclose())
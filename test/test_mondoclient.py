@@ -1,8 +1,16 @@
 from decimal import Decimal as D
 
+import asyncio
+import datetime
+
+import dateutil.parser
+import pytest
+
 from unittest import mock
 from mondo.client import MondoApi, MondoClient
+from mondo.exceptions import MondoApiException
 from mondo.mondo import Amount, Transaction
+from mondo.utils import parse_datetime
 from test import mock_api_response as responses
 
 
@@ -70,3 +78,201 @@ def test_transactions_contain_attachments(mock_request):
     assert transaction.attachments
     assert len(transaction.attachments) == 1
     assert transaction.attachments[0].file_url == 'http://www.random.url/image.gif'
+
+
+def test_clients_share_a_session():
+    with MondoClient('randomToken') as client:
+        other = MondoClient('otherToken', session=client.session)
+
+        assert other.session is client.session
+
+        with mock.patch.object(client.session, 'close') as mock_close:
+            other.close()
+
+        assert not mock_close.called
+
+
+@mock.patch('requests.Session.close')
+def test_client_closes_owned_session(mock_close):
+    with MondoClient('randomToken'):
+        pass
+
+    mock_close.assert_called_once_with()
+
+
+def test_async_client_keeps_one_session():
+    async def run():
+        async with MondoClient('randomToken', connector_limit=5,
+                               connector_limit_per_host=2) as client:
+            session = client.async_session
+
+            assert client.async_session is session
+            assert session.connector.limit == 5
+            assert session.connector.limit_per_host == 2
+        return session
+
+    session = asyncio.run(run())
+
+    assert session.closed
+
+
+@mock.patch.object(MondoApi, '_make_request')
+def test_client_iter_transactions_pages_by_last_id(mock_request):
+    transactions = responses.LIST_TRANSACTIONS['transactions']
+    mock_request.side_effect = [
+        {'transactions': transactions[:2]}, {'transactions': transactions[2:]}
+    ]
+
+    client = MondoClient('randomToken')
+    ids = [t.id for t in client.iter_transactions('my_account', page_size=2)]
+
+    assert ids == [t['id'] for t in transactions]
+    assert mock_request.call_count == 2
+    assert mock_request.call_args[0][1]['since'] == transactions[1]['id']
+    assert mock_request.call_args[0][1]['limit'] == 2
+
+
+@mock.patch.object(MondoApi, '_make_async_request')
+def test_client_iter_transactions_async(mock_request):
+    transactions = responses.LIST_TRANSACTIONS['transactions']
+    mock_request.side_effect = [
+        {'transactions': transactions[:2]}, {'transactions': []}
+    ]
+
+    async def run():
+        client = MondoClient('randomToken')
+        return [t async for t in client.iter_transactions_async(
+            'my_account', page_size=2)]
+
+    fetched = asyncio.run(run())
+
+    assert [t.id for t in fetched] == [t['id'] for t in transactions[:2]]
+    assert mock_request.call_args[0][1]['since'] == transactions[1]['id']
+
+
+def test_transaction_fields_are_converted_lazily():
+    transaction = Transaction(**responses.LIST_TRANSACTIONS['transactions'][1])
+
+    assert not hasattr(transaction, '__dict__')
+    assert transaction._created == '2016-04-02T12:04:51.01Z'
+    assert isinstance(transaction._merchant, dict)
+
+    assert transaction.created.year == 2016
+    assert transaction.emoji == '🍏'
+    assert transaction.merchant is transaction.merchant
+    assert transaction.amount == Amount('-6.50', 'GBP')
+
+
+def test_parse_datetime_matches_dateutil():
+    for timestamp in ['2016-04-02T11:13:07.71Z', '2016-04-01T10:23:52Z',
+                      '2016-03-08T19:46:15.645123456Z',
+                      '2016-04-02T11:13:07+01:00']:
+        parsed = parse_datetime(timestamp)
+
+        assert parsed == dateutil.parser.parse(timestamp)
+        assert parsed.tzinfo is not None
+
+    assert parse_datetime('2016-04-02T11:13:07.71Z').tzinfo is datetime.timezone.utc
+
+
+def test_amount_arithmetic():
+    coffee = Amount.from_minor(-250, 'GBP')
+    lunch = Amount('-5.50', 'GBP')
+
+    assert lunch.minor == -550
+    assert lunch.value == D('-5.50')
+    assert coffee + lunch == Amount.from_minor(-800, 'GBP')
+    assert lunch - coffee == Amount.from_minor(-300, 'GBP')
+    assert sum([coffee, lunch]) == Amount.total([coffee, lunch])
+    assert coffee * 2 == -Amount('5', 'GBP')
+    assert lunch < coffee < abs(coffee)
+    assert len({coffee, Amount.from_minor(-250, 'GBP')}) == 1
+
+    with pytest.raises(ValueError):
+        coffee + Amount.from_minor(100, 'EUR')
+
+
+def _fake_transaction(url, parameters=None, *args, **kwargs):
+    transaction_id = url.rsplit('/', 1)[-1]
+    if transaction_id == 'missing':
+        raise MondoApiException('not found')
+    transaction = dict(responses.SINGLE_TRANSACTION['transaction'])
+    transaction['id'] = transaction_id
+    return {'transaction': transaction}
+
+
+@mock.patch.object(MondoApi, '_make_request', side_effect=_fake_transaction)
+def test_client_get_transactions(mock_request):
+    client = MondoClient('randomToken')
+    results = client.get_transactions(['tx_1', 'missing', 'tx_2'],
+                                      concurrency=2)
+
+    assert [result.id for result in results] == ['tx_1', 'missing', 'tx_2']
+    assert results[0].transaction.id == 'tx_1'
+    assert results[2].transaction.id == 'tx_2'
+    assert results[1].transaction is None
+    assert isinstance(results[1].error, MondoApiException)
+
+
+def test_client_get_transactions_async():
+    async def fake_request(url, parameters=None, *args, **kwargs):
+        return _fake_transaction(url, parameters)
+
+    async def run():
+        client = MondoClient('randomToken')
+        with mock.patch.object(client, '_make_async_request',
+                               side_effect=fake_request):
+            return await client.get_transactions_async(
+                ['missing', 'tx_1'], concurrency=1)
+
+    results = asyncio.run(run())
+
+    assert isinstance(results[0].error, MondoApiException)
+    assert results[1].transaction.id == 'tx_1'
+
+
+@mock.patch.object(MondoApi, '_make_request')
+def test_client_shares_merchants_between_transactions(mock_request):
+    first, second = [
+        dict(responses.LIST_TRANSACTIONS['transactions'][1], id=transaction_id)
+        for transaction_id in ('tx_1', 'tx_2')
+    ]
+    mock_request.return_value = {'transactions': [first, second]}
+
+    client = MondoClient('randomToken')
+    transactions = client.list_transactions('my_awesome_account_id')
+
+    assert transactions[0].merchant is transactions[1].merchant
+    assert transactions[0].category is transactions[1].category
+    assert len(client.interner) == 1
+
+    other = MondoClient('randomToken', intern=False)
+    mock_request.return_value = {'transactions': [first, second]}
+    transactions = other.list_transactions('my_awesome_account_id')
+    assert transactions[0].merchant is not transactions[1].merchant
+
+
+@mock.patch.object(MondoApi, '_make_request')
+def test_client_raw_mode(mock_request):
+    mock_request.side_effect = [
+        responses.LIST_TRANSACTIONS, responses.SINGLE_TRANSACTION
+    ]
+
+    client = MondoClient('randomToken')
+
+    assert client.list_transactions('my_account', raw=True) == \
+        responses.LIST_TRANSACTIONS['transactions']
+    assert client.get_transaction('tx', raw=True) == \
+        responses.SINGLE_TRANSACTION['transaction']
+
+
+def test_client_uses_the_configured_json_decoder():
+    response = mock.Mock(ok=True, content=b'{"balance": 1, "currency": "GBP"}')
+    loads = mock.Mock(return_value=dict(responses.BALANCE))
+
+    client = MondoClient('randomToken', json_loads=loads)
+    with mock.patch.object(client.session, 'request', return_value=response):
+        balance = client.get_balance('my_awesome_account_id')
+
+    loads.assert_called_once_with(response.content)
+    assert balance.amount.minor == 1951
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from unittest import mock
+
+from mondo.client import MondoApi
+from mondo.exceptions import MondoApiException
+from mondo.pool import ClientPool, _round_robin
+from test import mock_api_response as responses
+
+
+def _fake_request(self, url, parameters=None, *args, **kwargs):
+    if self.access_token == 'broken':
+        raise MondoApiException('unauthorized', status_code=401)
+    return {'/accounts': responses.LIST_ACCOUNTS,
+            '/balance': responses.BALANCE}[url]
+
+
+@mock.patch.object(MondoApi, '_make_request', autospec=True,
+                   side_effect=_fake_request)
+def test_pool_balances_for_all_tenants(mock_request):
+    with ClientPool(concurrency=2) as pool:
+        for tenant in ('alice', 'bob', 'carol'):
+            pool.add(tenant, 'token_' + tenant)
+        pool.add('dave', 'broken')
+
+        balances = pool.balances()
+
+        assert pool['alice'].session is pool['bob'].session
+    assert balances['alice'].result.amount.minor == 1951
+    assert balances['carol'].result.currency == 'GBP'
+    assert isinstance(balances['dave'].error, MondoApiException)
+
+
+def test_jobs_are_scheduled_round_robin():
+    queues = OrderedDict([
+        ('alice', deque([(0, 'a1'), (1, 'a2'), (2, 'a3')])),
+        ('bob', deque([(3, 'b1')])),
+        ('carol', deque([(4, 'c1'), (5, 'c2')])),
+    ])
+
+    assert [job for _, _, job in _round_robin(queues)] == [
+        'a1', 'b1', 'c1', 'a2', 'c2', 'a3']
+
+
+def test_pool_fan_out_async_shares_one_session():
+    pool = ClientPool(concurrency=2)
+    pool.add('alice', 'token_alice')
+    pool.add('bob', 'token_bob')
+
+    async def session_of(client):
+        return client.async_session
+
+    async def run():
+        async with pool:
+            return await pool.fan_out_async(session_of)
+
+    results = asyncio.run(run())
+
+    assert results['alice'].result is results['bob'].result
+    assert results['alice'].result.closed
+
+
+def test_pool_fan_out_async_from_successive_event_loops(server):
+    with ClientPool() as pool:
+        for tenant in ('alice', 'bob'):
+            pool.add(tenant, 'token').BASE_API_URL = server.url
+
+        first = asyncio.run(pool.balances_async())
+        second = asyncio.run(pool.balances_async())
+
+    assert all(r.error is None for r in first.values())
+    assert all(r.error is None for r in second.values())
+
+
+def test_pool_sync_all_needs_a_store(server, tmpdir):
+    with ClientPool() as pool:
+        pool.add('alice', 'token', store_path=str(
+            tmpdir.join('alice.db'))).BASE_API_URL = server.url
+        pool.add('bob', 'token').BASE_API_URL = server.url
+
+        results = pool.sync_all()
+
+    assert results['alice'].result == len(server.transactions)
+    assert isinstance(results['bob'].error, ValueError)
+
+
+def test_concurrent_fan_outs_share_the_workers():
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def job(client):
+        with lock:
+            running.append(client)
+            peak.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.remove(client)
+
+    with ClientPool(concurrency=2) as pool:
+        for tenant in range(6):
+            pool.add(tenant, 'token')
+        callers = [threading.Thread(target=pool.fan_out, args=(job,))
+                   for _ in range(3)]
+        for caller in callers:
+            caller.start()
+        for caller in callers:
+            caller.join()
+
+    assert len(peak) == 18
+    assert max(peak) == 2
@@ -0,0 +1,79 @@
+from unittest import mock
+
+import pytest
+
+from mondo.client import MondoClient
+from mondo.exceptions import MondoApiException
+from mondo.retry import RetryPolicy, TokenBucket, parse_retry_after
+from test import mock_api_response as responses
+from test.conftest import http_response
+
+
+@mock.patch('time.sleep')
+def test_get_is_retried_honouring_retry_after(mock_sleep):
+    client = MondoClient('randomToken')
+    with mock.patch.object(client.session, 'request', side_effect=[
+        http_response(429, {'message': 'slow down'}, {'Retry-After': '2'}),
+        http_response(503, {'message': 'unavailable'}),
+        http_response(200, responses.BALANCE),
+    ]) as mock_request:
+        balance = client.get_balance('my_awesome_account_id')
+
+    assert balance.amount.minor == 1951
+    assert mock_request.call_count == 3
+    assert mock_sleep.call_args_list[0] == mock.call(2.0)
+
+
+@mock.patch('time.sleep')
+def test_retry_after_is_capped_by_max_backoff(mock_sleep):
+    client = MondoClient('randomToken', retry_policy=RetryPolicy(
+        max_backoff=5))
+    with mock.patch.object(client.session, 'request', side_effect=[
+        http_response(429, {'message': 'slow down'}, {'Retry-After': '3600'}),
+        http_response(429, {'message': 'slow down'},
+                  {'Retry-After': 'Fri, 31 Dec 9999 23:59:59 GMT'}),
+        http_response(200, responses.BALANCE),
+    ]):
+        client.get_balance('my_awesome_account_id')
+
+    assert mock_sleep.call_args_list == [mock.call(5), mock.call(5)]
+
+
+@mock.patch('time.sleep')
+def test_non_idempotent_requests_are_not_retried(mock_sleep):
+    client = MondoClient('randomToken')
+    with mock.patch.object(
+            client.session, 'request', return_value=http_response(
+                503, {'message': 'unavailable'})) as mock_request:
+        with pytest.raises(MondoApiException) as error:
+            client.register_webhook('my_awesome_account_id', 'http://hook')
+
+    assert mock_request.call_count == 1
+    assert error.value.status_code == 503
+    assert str(error.value) == 'unavailable'
+    assert not mock_sleep.called
+
+
+def test_retry_policy():
+    policy = RetryPolicy(max_retries=2, backoff_factor=1, max_backoff=3)
+
+    assert policy.should_retry('GET', 500, 0)
+    assert policy.should_retry('get', None, 1)
+    assert not policy.should_retry('GET', 500, 2)
+    assert not policy.should_retry('GET', 404, 0)
+    assert not policy.should_retry('PATCH', 429, 0)
+    assert 0 <= policy.delay(5) <= 3
+    assert policy.delay(5, retry_after=2) == 2
+    assert policy.delay(5, retry_after=7) == 3
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0
+    assert parse_retry_after(None) is None
+
+
+def test_token_bucket_spreads_bursts():
+    bucket = TokenBucket(rate=10, capacity=2)
+
+    waits = [bucket._reserve() for _ in range(4)]
+
+    assert waits[:2] == [0, 0]
+    assert 0.09 < waits[2] < 0.11
+    assert 0.19 < waits[3] < 0.21
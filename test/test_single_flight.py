@@ -0,0 +1,114 @@
+import asyncio
+
+from mondo.exceptions import MondoApiException
+from test.conftest import make_client
+
+MOCK_SERVER = {'transactions': 10, 'latency': 0.05}
+
+
+def run(server, coroutine_function):
+    before = server.requests
+    result = asyncio.run(coroutine_function())
+    return result, server.requests - before
+
+
+def test_concurrent_identical_gets_share_one_request(server):
+    client = make_client(server)
+    transaction_id = server.transactions[0]['id']
+
+    async def burst():
+        async with client:
+            return await asyncio.gather(*[
+                client.get_transaction_async(transaction_id)
+                for _ in range(20)])
+
+    transactions, requests = run(server, burst)
+
+    assert requests == 1
+    assert {t.id for t in transactions} == {transaction_id}
+    # each caller gets its own model, and its own payload
+    assert len({id(t) for t in transactions}) == 20
+    transactions[0].metadata['note'] = 'mutated'
+    assert all('note' not in t.metadata for t in transactions[1:])
+
+
+def test_different_urls_and_tokens_are_not_coalesced(server):
+    first = make_client(server, 'firstToken')
+    second = make_client(server, 'secondToken')
+    ids = [t['id'] for t in server.transactions[:2]]
+
+    async def burst():
+        async with first, second:
+            return await asyncio.gather(
+                first.get_transaction_async(ids[0]),
+                first.get_transaction_async(ids[1]),
+                second.get_transaction_async(ids[0]))
+
+    _, requests = run(server, burst)
+
+    assert requests == 3
+
+
+def test_sequential_gets_are_not_coalesced(server):
+    client = make_client(server)
+    transaction_id = server.transactions[0]['id']
+
+    async def sequence():
+        async with client:
+            await client.get_transaction_async(transaction_id)
+            await client.get_transaction_async(transaction_id)
+
+    _, requests = run(server, sequence)
+
+    assert requests == 2
+    assert client._in_flight == {}
+
+
+def test_coalescing_can_be_disabled(server):
+    client = make_client(server, coalesce=False)
+    transaction_id = server.transactions[0]['id']
+
+    async def burst():
+        async with client:
+            await asyncio.gather(*[
+                client.get_transaction_async(transaction_id)
+                for _ in range(3)])
+
+    _, requests = run(server, burst)
+
+    assert requests == 3
+
+
+def test_errors_reach_every_caller(server):
+    client = make_client(server)
+
+    async def burst():
+        async with client:
+            return await asyncio.gather(*[
+                client.get_transaction_async('tx_missing') for _ in range(5)
+            ], return_exceptions=True)
+
+    errors, requests = run(server, burst)
+
+    assert requests == 1
+    assert all(isinstance(e, MondoApiException) for e in errors)
+
+
+def test_a_cancelled_caller_does_not_cancel_the_others(server):
+    client = make_client(server)
+    transaction_id = server.transactions[0]['id']
+
+    async def burst():
+        async with client:
+            first = asyncio.ensure_future(
+                client.get_transaction_async(transaction_id))
+            second = asyncio.ensure_future(
+                client.get_transaction_async(transaction_id))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second
+
+    transaction, requests = run(server, burst)
+
+    assert requests == 1
+    assert transaction.id == transaction_id
@@ -0,0 +1,77 @@
+import datetime
+from unittest import mock
+
+from mondo.client import MondoApi, MondoClient
+from test import mock_api_response as responses
+
+TRANSACTIONS = responses.LIST_TRANSACTIONS['transactions']
+
+
+@mock.patch.object(MondoApi, '_make_request')
+def test_store_sync_is_incremental(mock_request):
+    mock_request.side_effect = [
+        {'transactions': TRANSACTIONS[:2]}, {'transactions': TRANSACTIONS[2:]}
+    ]
+
+    client = MondoClient('randomToken')
+    store = client.open_store()
+
+    assert store.sync('my_awesome_account_id') == 2
+    assert store.cursor('my_awesome_account_id') == TRANSACTIONS[1]['id']
+
+    assert store.sync('my_awesome_account_id') == 1
+    assert mock_request.call_args[0][1]['since'] == TRANSACTIONS[1]['id']
+    assert store.cursor('my_awesome_account_id') == TRANSACTIONS[2]['id']
+
+
+@mock.patch.object(MondoApi, '_make_request')
+def test_store_serves_reads_from_disk(mock_request):
+    mock_request.side_effect = [
+        responses.LIST_TRANSACTIONS, responses.LIST_ACCOUNTS
+    ]
+
+    client = MondoClient('randomToken')
+    client.open_store().sync('my_awesome_account_id')
+    account = client.list_accounts()[0]
+
+    assert [t.id for t in account.transactions] == [
+        t['id'] for t in TRANSACTIONS
+    ]
+    transaction = client.get_transaction('tx_0001')
+    assert transaction.merchant.name == 'The Co-operative Food'
+    assert mock_request.call_count == 2
+
+
+def test_store_compares_dates_whatever_the_timestamp_precision():
+    client = MondoClient('randomToken')
+    store = client.open_store()
+    store.upsert('my_account', [
+        dict(TRANSACTIONS[0], id='tx_a', created='2016-04-02T11:13:07.71Z'),
+        dict(TRANSACTIONS[0], id='tx_b', created='2016-04-02T11:13:08Z'),
+    ])
+
+    since = store.list_transactions(
+        'my_account', since=datetime.datetime(2016, 4, 2, 11, 13, 7))
+    before = store.list_transactions(
+        'my_account', before=datetime.datetime(
+            2016, 4, 2, 12, 13, 7, 800000,
+            tzinfo=datetime.timezone(datetime.timedelta(hours=1))))
+
+    assert [t.id for t in since] == ['tx_a', 'tx_b']
+    assert [t.id for t in before] == ['tx_a']
+
+
+@mock.patch.object(MondoApi, '_make_request')
+def test_store_falls_back_to_the_api_for_unsynced_accounts(mock_request):
+    mock_request.side_effect = [
+        responses.LIST_ACCOUNTS, responses.LIST_TRANSACTIONS
+    ]
+
+    client = MondoClient('randomToken')
+    client.open_store()
+    account = client.list_accounts()[0]
+
+    assert [t.id for t in account.transactions] == [
+        t['id'] for t in TRANSACTIONS
+    ]
+    assert mock_request.call_args[0][0] == '/transactions'
@@ -0,0 +1,80 @@
+import asyncio
+import io
+import json
+from unittest import mock
+
+import pytest
+import requests
+from aiohttp import web
+
+from mondo.client import MondoClient
+from mondo.streaming import JSONArrayStream
+from test import mock_api_response as responses
+
+BODY = json.dumps(
+    dict(responses.LIST_TRANSACTIONS, cursor=12345, extra={'a': [1, 2]}),
+    indent=2, ensure_ascii=False
+).encode()
+
+TRANSACTIONS = responses.LIST_TRANSACTIONS['transactions']
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, len(BODY)])
+def test_stream_yields_every_item_whatever_the_chunking(chunk_size):
+    stream = JSONArrayStream('transactions')
+    items = []
+    for start in range(0, len(BODY), chunk_size):
+        items.extend(stream.feed(BODY[start:start + chunk_size]))
+    items.extend(stream.close())
+
+    assert items == TRANSACTIONS
+
+
+def test_stream_yields_items_before_the_end_of_the_body():
+    stream = JSONArrayStream('transactions')
+    first = json.dumps(TRANSACTIONS[0]).encode()
+
+    assert stream.feed(b'{"transactions": [' + first + b',') == [
+        TRANSACTIONS[0]]
+    with pytest.raises(ValueError):
+        stream.close()
+
+
+def test_client_stream_transactions():
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(BODY)
+
+    client = MondoClient('randomToken')
+    with mock.patch.object(client.session, 'request', return_value=response):
+        transactions = list(client.stream_transactions('my_account'))
+
+    assert [t.id for t in transactions] == [t['id'] for t in TRANSACTIONS]
+    assert transactions[1].merchant.name == 'The Co-operative Food'
+
+
+def test_client_stream_transactions_async():
+    async def handler(request):
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for i in range(0, len(BODY), 100):
+            await response.write(BODY[i:i + 100])
+        return response
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/transactions', handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        try:
+            async with MondoClient('randomToken') as client:
+                client.BASE_API_URL = 'http://127.0.0.1:{}'.format(port)
+                return [t.id async for t in client.stream_transactions_async(
+                    'my_account')]
+        finally:
+            await runner.cleanup()
+
+    assert asyncio.run(run()) == [t['id'] for t in TRANSACTIONS]
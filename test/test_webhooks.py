@@ -0,0 +1,115 @@
+import asyncio
+
+import aiohttp
+
+from mondo.mondo import Transaction
+from mondo.webhooks import WebhookReceiver
+from test import mock_api_response as responses
+
+
+def _event(transaction):
+    return {'type': 'transaction.created', 'data': transaction}
+
+
+def test_receiver_dispatches_transactions_once():
+    received = []
+    receiver = WebhookReceiver(workers=2)
+
+    @receiver.on('transaction.created')
+    async def handler(transaction):
+        received.append(transaction)
+
+    async def run():
+        await receiver.start('127.0.0.1', 0)
+        url = 'http://127.0.0.1:{}/webhook'.format(receiver.port)
+        async with receiver, aiohttp.ClientSession() as session:
+            statuses = []
+            for transaction in responses.LIST_TRANSACTIONS['transactions'] * 2:
+                async with session.post(url, json=_event(transaction)) as r:
+                    statuses.append(r.status)
+            async with session.post(url, data=b'not json') as r:
+                statuses.append(r.status)
+            await receiver.join()
+        return statuses
+
+    statuses = asyncio.run(run())
+
+    assert statuses == [200] * 6 + [400]
+    assert all(isinstance(t, Transaction) for t in received)
+    assert sorted(t.id for t in received) == sorted(
+        t['id'] for t in responses.LIST_TRANSACTIONS['transactions'])
+
+
+def test_receiver_refuses_events_when_the_queue_is_full():
+    receiver = WebhookReceiver(workers=1, queue_size=1, enqueue_timeout=0.01)
+    release = None
+
+    @receiver.on('transaction.created')
+    async def slow_handler(transaction):
+        await release.wait()
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        await receiver.start('127.0.0.1', 0)
+        url = 'http://127.0.0.1:{}/webhook'.format(receiver.port)
+        statuses = []
+        async with aiohttp.ClientSession() as session:
+            for transaction in responses.LIST_TRANSACTIONS['transactions']:
+                async with session.post(url, json=_event(transaction)) as r:
+                    statuses.append(r.status)
+                await asyncio.sleep(0.01)
+        release.set()
+        await receiver.stop()
+        return statuses
+
+    assert asyncio.run(run()) == [200, 200, 503]
+
+
+def test_receiver_refuses_unparsable_transactions_without_remembering_them():
+    received = []
+    receiver = WebhookReceiver()
+    receiver.add_handler(received.append)
+    complete = responses.LIST_TRANSACTIONS['transactions'][0]
+    partial = {key: complete[key] for key in
+               ('id', 'description', 'amount', 'currency', 'created')}
+
+    async def run():
+        await receiver.start('127.0.0.1', 0)
+        url = 'http://127.0.0.1:{}/webhook'.format(receiver.port)
+        statuses = []
+        async with receiver, aiohttp.ClientSession() as session:
+            for transaction in (partial, complete):
+                async with session.post(url, json=_event(transaction)) as r:
+                    statuses.append(r.status)
+            await receiver.join()
+        return statuses
+
+    assert asyncio.run(run()) == [400, 200]
+    assert [t.id for t in received] == [complete['id']]
+
+
+def test_failed_dispatch_forgets_the_event():
+    attempts = []
+    receiver = WebhookReceiver()
+
+    @receiver.on('transaction.created')
+    def flaky(transaction):
+        attempts.append(transaction.id)
+        if len(attempts) == 1:
+            raise RuntimeError('database down')
+
+    transaction = responses.LIST_TRANSACTIONS['transactions'][0]
+
+    async def run():
+        await receiver.start('127.0.0.1', 0)
+        url = 'http://127.0.0.1:{}/webhook'.format(receiver.port)
+        async with receiver, aiohttp.ClientSession() as session:
+            for _ in range(2):
+                async with session.post(url, json=_event(transaction)):
+                    pass
+                await receiver.join()
+
+    asyncio.run(run())
+
+    assert attempts == [transaction['id']] * 2
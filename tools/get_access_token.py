@@ -25,7 +25,7 @@ if __name__ == '__main__':
     print("\n")
     auth_code = input("Then paste the resulting auth code here: ")
 
-    access_token, refresh_token = exchange_authorization_code_for_access_token(
+    access = exchange_authorization_code_for_access_token(
         client_id=client_id,
         client_secret=client_secret,
         authorization_code=auth_code,
@@ -35,6 +35,6 @@ if __name__ == '__main__':
     print("\n")
     print("SUCCESS!")
     print("\n")
-    print("Your access token is: %s" % access_token)
+    print("Your access token is: %s" % access.access_token)
     print("\n")
-    print("Your refresh token is: %s" % refresh_token)
+    print("Your refresh token is: %s" % access.refresh_token)
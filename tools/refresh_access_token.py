@@ -10,7 +10,7 @@ if __name__ == '__main__':
     client_secret = input("Insert your client_secret: ")
     refresh_token = input("Insert your refresh token here: ")
 
-    access_token, refresh_token = refresh_access_token(
+    access = refresh_access_token(
         client_id=client_id,
         client_secret=client_secret,
         refresh_token=refresh_token
@@ -19,8 +19,8 @@ if __name__ == '__main__':
     print("SUCCESS!")
     print("\n")
     print("Your new access token is: ")
-    print(access_token)
+    print(access.access_token)
     print("\n")
     print("Your new refresh token is: ")
-    print(refresh_token)
+    print(access.refresh_token)
 